@@ -0,0 +1,49 @@
+import dataclasses as dc
+import time
+
+
+@dc.dataclass
+class CacheEntry[V]:
+    value: V
+    # Wall-clock time, so entries loaded from disk keep their age
+    fetched_at: float
+
+    def age_s(self) -> float:
+        return time.time() - self.fetched_at
+
+
+@dc.dataclass
+class TTLCache[K, V]:
+    """In-memory cache whose entries are fresh for `ttl_s` seconds.
+
+    Expired entries are kept so callers can serve them while refreshing.
+    """
+
+    ttl_s: float
+    entries: dict[K, CacheEntry[V]] = dc.field(default_factory=dict)
+
+    def get(self, key: K) -> V | None:
+        """The cached value if it is still fresh."""
+        entry = self.entries.get(key)
+        if entry is None or entry.age_s() >= self.ttl_s:
+            return None
+        return entry.value
+
+    def get_entry(self, key: K) -> CacheEntry[V] | None:
+        """The cached entry, fresh or expired."""
+        return self.entries.get(key)
+
+    def is_fresh(self, entry: CacheEntry[V]) -> bool:
+        return entry.age_s() < self.ttl_s
+
+    def put(self, key: K, value: V, fetched_at: float | None = None) -> None:
+        self.entries[key] = CacheEntry(
+            value=value, fetched_at=time.time() if fetched_at is None else fetched_at
+        )
+
+    def invalidate(self, key: K) -> None:
+        self.entries.pop(key, None)
+
+    def prune(self) -> None:
+        """Drop expired entries, for caches with many short-lived keys."""
+        self.entries = {k: e for k, e in self.entries.items() if self.is_fresh(e)}
@@ -0,0 +1,59 @@
+import asyncio
+import re
+import typing as tp
+
+from playwright.async_api import Page, Response
+
+from .logger import logger
+
+
+class ResponseCollector:
+    """Collects the JSON bodies of successful GET responses matching a pattern.
+
+    Bodies are read in background tasks as responses arrive; `drain()` waits
+    for those reads and returns the (url, body) pairs collected since the
+    last drain.
+    """
+
+    def __init__(self, page: Page, pattern: str) -> None:
+        self._page = page
+        self._pattern = re.compile(pattern)
+        self._pending: set[asyncio.Task[None]] = set()
+        self._bodies: list[tuple[str, tp.Any]] = []
+
+    def _on_response(self, response: Response) -> None:
+        if (
+            response.ok
+            and response.request.method == "GET"
+            and self._pattern.search(response.url)
+        ):
+            task = asyncio.create_task(self._read(response))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _read(self, response: Response) -> None:
+        try:
+            self._bodies.append((response.url, await response.json()))
+        except Exception as e:
+            # The page may have navigated away before the body was read
+            logger.debug(f"Could not read response body from {response.url}: {e}")
+
+    def start(self) -> "ResponseCollector":
+        self._page.on("response", self._on_response)
+        return self
+
+    def stop(self) -> None:
+        self._page.remove_listener("response", self._on_response)
+        for task in self._pending:
+            task.cancel()
+
+    async def drain(self) -> list[tuple[str, tp.Any]]:
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        bodies, self._bodies = self._bodies, []
+        return bodies
+
+
+def collect_responses(page: Page, pattern: str) -> ResponseCollector:
+    """Start collecting JSON responses matching `pattern`; call `stop()` when done."""
+    return ResponseCollector(page, pattern).start()
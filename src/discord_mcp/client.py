@@ -1,9 +1,36 @@
 import asyncio
 import pathlib as pl
-from datetime import datetime, timezone
+import re
+import time
+import typing as tp
+from collections.abc import AsyncIterator
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
 import dataclasses as dc
-from playwright.async_api import async_playwright, Browser, Page, Playwright
+from playwright.async_api import (
+    async_playwright,
+    Browser,
+    BrowserContext,
+    Frame,
+    Page,
+    Playwright,
+    Response,
+)
+from .capture import ResponseCollector, collect_responses
+from .harvest import MessageHarvester, harvest_messages
 from .logger import logger
+from .routing import ResourceBlocker, ResourcePolicy
+from .snowflake import parse_snowflake, snowflake_to_datetime
+from .waits import (
+    RequestTracker,
+    track_requests,
+    wait_for_quiet,
+)
+
+_MESSAGES_API_PATTERN = r"/api/v\d+/channels/\d+/messages"
+_SEARCH_API_PATTERN = r"/api/v\d+/guilds/\d+/messages/search"
+# Scroll steps in a row that may add no messages before a read gives up
+_MAX_STALLED_SCROLLS = 3
 
 
 @dc.dataclass(frozen=True)
@@ -13,8 +40,33 @@ class DiscordMessage:
     author_name: str
     author_id: str
     channel_id: str
-    timestamp: datetime
+    # None when neither an ID nor a rendered time says when it was sent
+    timestamp: datetime | None
     attachments: list[str]
+    edited_timestamp: datetime | None = None
+    reply_to_id: str | None = None
+    # [{"emoji": ..., "count": ...}] and [{"title": ..., "url": ..., "description": ...}]
+    reactions: list[dict] = dc.field(default_factory=list)
+    embeds: list[dict] = dc.field(default_factory=list)
+    # Sticker names
+    stickers: list[str] = dc.field(default_factory=list)
+    # The account name search's `from:` matches; only known from the API
+    author_username: str | None = None
+
+
+@dc.dataclass
+class HistoryCoverage:
+    """Filled in by `iter_channel_messages` as it reads.
+
+    Every message of the channel from `oldest_id` up to the newest message
+    read was yielded, so that part of history was read without gaps. None
+    while nothing has been read. An oldest-first read that stopped before
+    reaching the newest message sets `newest_id`, the exclusive upper bound
+    of what it read.
+    """
+
+    oldest_id: int | None = None
+    newest_id: int | None = None
 
 
 @dc.dataclass(frozen=True)
@@ -32,6 +84,34 @@ class DiscordGuild:
     icon: str | None = None
 
 
+@dc.dataclass
+class LoginCache:
+    """Remembers when the session was last seen logged in.
+
+    Shared by every state derived from the same browser context. Successful
+    navigations refresh it; a redirect to /login or a 401 from the API
+    invalidates it, so a known-good session skips the `_check_logged_in` probe.
+    """
+
+    ttl_s: float = 900.0
+    validated_at: float | None = None
+    lock: asyncio.Lock = dc.field(default_factory=asyncio.Lock)
+
+    def is_valid(self) -> bool:
+        return (
+            self.validated_at is not None
+            and time.monotonic() - self.validated_at < self.ttl_s
+        )
+
+    def mark_valid(self) -> None:
+        self.validated_at = time.monotonic()
+
+    def invalidate(self, reason: str) -> None:
+        if self.validated_at is not None:
+            logger.debug(f"Login cache invalidated: {reason}")
+        self.validated_at = None
+
+
 @dc.dataclass(frozen=True)
 class ClientState:
     email: str
@@ -40,40 +120,108 @@ class ClientState:
     extra_wait_ms: int = 0
     playwright: Playwright | None = None
     browser: Browser | None = None
-    context: object | None = None  # BrowserContext
+    context: BrowserContext | None = None
     page: Page | None = None
     logged_in: bool = False
+    login_cache: LoginCache = dc.field(default_factory=LoginCache)
+    resource_blocker: ResourceBlocker | None = None
     cookies_file: pl.Path = dc.field(
         default_factory=lambda: pl.Path.home() / ".discord_mcp_cookies.json"
     )
+    profile_dir: pl.Path | None = None
 
 
 def create_client_state(
-    email: str, password: str, headless: bool = True, extra_wait_ms: int = 0
+    email: str,
+    password: str,
+    headless: bool = True,
+    extra_wait_ms: int = 0,
+    login_cache_ttl_s: float = 900.0,
+    resource_policy: ResourcePolicy | None = None,
+    profile_dir: pl.Path | None = None,
 ) -> ClientState:
     return ClientState(
-        email=email, password=password, headless=headless, extra_wait_ms=extra_wait_ms
+        email=email,
+        password=password,
+        headless=headless,
+        extra_wait_ms=extra_wait_ms,
+        login_cache=LoginCache(ttl_s=login_cache_ttl_s),
+        resource_blocker=ResourceBlocker(resource_policy) if resource_policy else None,
+        profile_dir=profile_dir,
     )
 
 
-async def _ensure_browser(state: ClientState) -> ClientState:
-    if state.playwright and state.browser and state.context and state.page:
-        return state
+def _is_login_url(url: str) -> bool:
+    return any(path in url for path in ["/login", "/register"])
 
-    playwright = await async_playwright().start()
-    browser = await playwright.chromium.launch(headless=state.headless)
 
+def _watch_session(context: BrowserContext, cache: LoginCache) -> None:
+    """Invalidate the login cache from navigation results, without probing."""
+
+    def on_response(response: Response) -> None:
+        if response.status == 401 and "discord.com/api/" in response.url:
+            cache.invalidate(f"401 from {response.url}")
+
+    def on_page(page: Page) -> None:
+        def on_navigated(frame: Frame) -> None:
+            if frame == page.main_frame and _is_login_url(frame.url):
+                cache.invalidate(f"redirected to {frame.url}")
+
+        page.on("framenavigated", on_navigated)
+
+    context.on("response", on_response)
+    context.on("page", on_page)
+    for page in context.pages:
+        on_page(page)
+
+
+async def _launch_context(
+    state: ClientState, playwright: Playwright
+) -> tuple[Browser | None, BrowserContext]:
+    if state.profile_dir:
+        # Persistent profile: HTTP cache, service worker and Discord's local
+        # state survive restarts. There is no separate Browser object.
+        state.profile_dir.mkdir(parents=True, exist_ok=True)
+        context = await playwright.chromium.launch_persistent_context(
+            str(state.profile_dir), headless=state.headless
+        )
+        return None, context
+
+    browser = await playwright.chromium.launch(headless=state.headless)
     ctx_kwargs = {}
     if state.cookies_file.exists():
         ctx_kwargs["storage_state"] = str(state.cookies_file)
-    context = await browser.new_context(**ctx_kwargs)
-    page = await context.new_page()
+    return browser, await browser.new_context(**ctx_kwargs)
+
+
+async def _ensure_browser(state: ClientState) -> ClientState:
+    if state.playwright and state.context and state.page:
+        return state
+
+    started = time.perf_counter()
+    playwright = await async_playwright().start()
+    browser, context = await _launch_context(state, playwright)
+    _watch_session(context, state.login_cache)
+    if state.resource_blocker:
+        await state.resource_blocker.install(context)
+    page = context.pages[0] if context.pages else await context.new_page()
+    logger.debug(
+        f"Browser launched in {time.perf_counter() - started:.2f}s"
+        f" (profile: {state.profile_dir or 'ephemeral'})"
+    )
 
     return dc.replace(
         state, playwright=playwright, browser=browser, context=context, page=page
     )
 
 
+def is_client_connected(state: ClientState) -> bool:
+    if state.browser:
+        return state.browser.is_connected()
+    # Persistent contexts have no Browser; a crashed one has lost its pages
+    return bool(state.context and state.context.pages)
+
+
 async def _save_storage_state(state: ClientState) -> None:
     if state.page:
         await state.page.context.storage_state(path=str(state.cookies_file))
@@ -93,10 +241,7 @@ async def _check_logged_in(state: ClientState) -> bool:
         )
 
         url = state.page.url
-        if (
-            any(path in url for path in ["/login", "/register"])
-            or "/channels/@me" not in url
-        ):
+        if _is_login_url(url) or "/channels/@me" not in url:
             return False
 
         return bool(
@@ -109,18 +254,31 @@ async def _check_logged_in(state: ClientState) -> bool:
 
 
 async def _login(state: ClientState) -> ClientState:
-    if state.logged_in:
+    if state.logged_in and state.login_cache.is_valid():
         return state
 
     state = await _ensure_browser(state)
     if not state.page:
         raise RuntimeError("Browser page not initialized")
 
-    if await _check_logged_in(state):
-        return dc.replace(state, logged_in=True)
+    # Pages sharing a context must not run the login flow concurrently
+    async with state.login_cache.lock:
+        if state.login_cache.is_valid():
+            return dc.replace(state, logged_in=True)
+        if await _check_logged_in(state):
+            state.login_cache.mark_valid()
+            return dc.replace(state, logged_in=True)
+        return await _login_with_credentials(state)
+
+
+async def _login_with_credentials(state: ClientState) -> ClientState:
+    if not state.page:
+        raise RuntimeError("Browser page not initialized")
 
     await state.page.goto("https://discord.com/login")
-    await asyncio.sleep(2)
+    await state.page.wait_for_selector(
+        'input[name="email"]', state="visible", timeout=15000 + state.extra_wait_ms
+    )
 
     await state.page.fill('input[name="email"]', state.email)
     await state.page.fill('input[name="password"]', state.password)
@@ -130,7 +288,7 @@ async def _login(state: ClientState) -> ClientState:
         await state.page.wait_for_function(
             "() => !window.location.href.includes('/login')", timeout=60000
         )
-        await asyncio.sleep(1 + state.extra_wait_ms / 1000)
+        await wait_for_quiet(state.page, timeout_ms=1000 + state.extra_wait_ms)
 
         if (
             "/verify" in state.page.url
@@ -141,15 +299,18 @@ async def _login(state: ClientState) -> ClientState:
             )
 
         if await _check_logged_in(state):
-            was_logged_in = state.logged_in
+            state.login_cache.mark_valid()
             state = dc.replace(state, logged_in=True)
-            await asyncio.sleep(5)
-            if state.page:
-                await state.page.goto("https://discord.com/channels/@me")
-            await asyncio.sleep(3)
-
-            if not was_logged_in:
-                await _save_storage_state(state)
+            # _check_logged_in left us on /channels/@me with the guild nav
+            # rendered; let the client settle before persisting its storage
+            try:
+                if state.page:
+                    await state.page.wait_for_load_state(
+                        "networkidle", timeout=8000 + state.extra_wait_ms
+                    )
+            except Exception:
+                logger.debug("Network did not go idle after login, saving anyway")
+            await _save_storage_state(state)
             return state
         else:
             raise RuntimeError("Login appeared to succeed but verification failed")
@@ -157,6 +318,126 @@ async def _login(state: ClientState) -> ClientState:
         raise RuntimeError(f"Failed to login to Discord: {e}")
 
 
+def is_logged_out(state: ClientState) -> bool:
+    if not state.page or state.page.is_closed():
+        return True
+    return _is_login_url(state.page.url)
+
+
+_SPA_NAVIGATE_JS = """
+    (path) => {
+        if (!document.querySelector('[data-list-id="guildsnav"]')) return null;
+        if (location.pathname === path) return 'current';
+        const link = document.querySelector(`a[href="${path}"]`);
+        if (link) {
+            link.click();
+            return 'click';
+        }
+        history.pushState(history.state, '', path);
+        window.dispatchEvent(new PopStateEvent('popstate', { state: history.state }));
+        return 'history';
+    }
+"""
+
+
+async def _navigate_in_app(state: ClientState, url: str, ready_selector: str) -> bool:
+    """Switch routes inside the already-running Discord client.
+
+    Clicks a matching nav link, or pushes the path onto the client's router,
+    instead of reloading the whole app. Returns False when the page is not
+    on a loaded Discord client or the route did not render `ready_selector`.
+    """
+    page = state.page
+    if not page or not page.url.startswith("https://discord.com/channels/"):
+        return False
+
+    path = urlsplit(url).path
+    try:
+        # Close an open modal so it doesn't cover the new route. Escape is
+        # only sent then, since in a channel it marks messages as read.
+        if await page.query_selector('[role="dialog"]'):
+            await page.keyboard.press("Escape")
+        method = await page.evaluate(_SPA_NAVIGATE_JS, path)
+        if not method:
+            return False
+        # Guild routes redirect to the last opened channel, e.g. /channels/1/2
+        await page.wait_for_function(
+            "path => location.pathname === path"
+            " || location.pathname.startsWith(path + '/')",
+            arg=path,
+            timeout=2000 + state.extra_wait_ms,
+        )
+        await page.wait_for_selector(ready_selector, timeout=3000 + state.extra_wait_ms)
+    except Exception as e:
+        logger.debug(f"In-app navigation to {path} failed, reloading: {e}")
+        return False
+
+    if _is_login_url(page.url):
+        return False
+    logger.debug(f"Navigated in-app to {path} via {method}")
+    return True
+
+
+async def _goto(
+    state: ClientState, url: str, ready_selector: str | None = None
+) -> ClientState:
+    """Navigate to a Discord URL, re-authenticating once if sent to /login.
+
+    With `ready_selector`, first try switching routes inside the running
+    client and only fall back to a full page load if that fails.
+    """
+    if not state.page:
+        raise RuntimeError("Browser page not initialized")
+
+    if ready_selector and await _navigate_in_app(state, url, ready_selector):
+        state.login_cache.mark_valid()
+        return state
+
+    started = time.perf_counter()
+    await state.page.goto(url, wait_until="domcontentloaded")
+    logger.debug(f"Loaded {url} in {time.perf_counter() - started:.2f}s")
+    if not _is_login_url(state.page.url):
+        state.login_cache.mark_valid()
+        return state
+
+    state.login_cache.invalidate(f"redirected to {state.page.url}")
+    state = await _login(dc.replace(state, logged_in=False))
+    if not state.page:
+        raise RuntimeError("Browser page not initialized")
+    await state.page.goto(url, wait_until="domcontentloaded")
+    return state
+
+
+async def start_client(state: ClientState) -> ClientState:
+    """Launch the browser and log in, returning a state ready for operations."""
+    return await _login(state)
+
+
+async def open_page(state: ClientState) -> Page:
+    """Open another page in the logged-in context, pre-navigated to Discord."""
+    if not state.context:
+        raise RuntimeError("Browser context not initialized")
+    page = await state.context.new_page()
+    try:
+        await page.goto(
+            "https://discord.com/channels/@me", wait_until="domcontentloaded"
+        )
+    except Exception:
+        await page.close()
+        raise
+    return page
+
+
+async def is_page_healthy(page: Page, timeout_s: float = 5.0) -> bool:
+    if page.is_closed() or _is_login_url(page.url):
+        return False
+    try:
+        await asyncio.wait_for(page.evaluate("() => document.readyState"), timeout_s)
+        return True
+    except Exception:
+        return False
+
+
 async def close_client(state: ClientState) -> None:
     # Close resources in reverse order: page -> context -> browser -> playwright
     resources = [
@@ -181,13 +462,15 @@ async def close_client(state: ClientState) -> None:
 
 async def get_guilds(state: ClientState) -> tuple[ClientState, list[DiscordGuild]]:
     state = await _login(state)
-    if not state.page:
-        raise RuntimeError("Browser page not initialized")
 
     logger.debug("Starting guild detection process")
-    await state.page.goto(
-        "https://discord.com/channels/@me", wait_until="domcontentloaded"
+    state = await _goto(
+        state,
+        "https://discord.com/channels/@me",
+        '[data-list-id="guildsnav"] [role="treeitem"]',
     )
+    if not state.page:
+        raise RuntimeError("Browser page not initialized")
     logger.debug(f"Navigated to Discord, current URL: {state.page.url}")
 
     # Wait for Discord to fully load guilds with text content
@@ -197,7 +480,11 @@ async def get_guilds(state: ClientState) -> tuple[ClientState, list[DiscordGuild
             state="visible",
             timeout=15000,
         )
-        await state.page.wait_for_timeout(1000 + state.extra_wait_ms)
+        await wait_for_quiet(
+            state.page,
+            '[data-list-id="guildsnav"]',
+            timeout_ms=1000 + state.extra_wait_ms,
+        )
 
         # Scroll guild navigation to load all guilds
         await state.page.evaluate("""
@@ -206,20 +493,28 @@ async def get_guilds(state: ClientState) -> tuple[ClientState, list[DiscordGuild
                 const container = guildNav?.closest('[class*="guilds"]') || guildNav?.parentElement;
                 if (container) {
                     container.scrollTop = 0;
+                    // One viewport per frame, so every guild renders once
                     return new Promise(resolve => {
                         let scrolls = 0;
-                        const interval = setInterval(() => {
-                            container.scrollBy(0, 100);
-                            if (++scrolls >= 20 || container.scrollTop + container.clientHeight >= container.scrollHeight - 10) {
-                                clearInterval(interval);
+                        const step = () => {
+                            container.scrollBy(0, container.clientHeight);
+                            if (++scrolls >= 50 || container.scrollTop + container.clientHeight >= container.scrollHeight - 10) {
                                 resolve();
+                            } else {
+                                requestAnimationFrame(step);
                             }
-                        }, 100);
+                        };
+                        requestAnimationFrame(step);
                     });
                 }
             }
         """)
-        await state.page.wait_for_timeout(500 + state.extra_wait_ms)
+        await wait_for_quiet(
+            state.page,
+            '[data-list-id="guildsnav"]',
+            quiet_ms=150,
+            timeout_ms=500 + state.extra_wait_ms,
+        )
     except Exception:
         pass
 
@@ -279,50 +574,81 @@ async def get_guilds(state: ClientState) -> tuple[ClientState, list[DiscordGuild
     return state, guilds
 
 
-async def get_guild_channels(
+def _extract_channels_js(guild_id: str) -> str:
+    return f"""
+        (() => {{
+            const channels = [];
+            const seenIds = new Set();
+            const links = document.querySelectorAll('a[href*="/channels/"]');
+            
+            links.forEach(link => {{
+                const match = link.href.match(/\\/channels\\/{guild_id}\\/([0-9]+)/);
+                if (match) {{
+                    const channelId = match[1];
+                    if (!seenIds.has(channelId)) {{
+                        seenIds.add(channelId);
+                        let name = link.textContent?.trim() || '';
+                        name = name.replace(/^[^a-zA-Z0-9#-_]+/, '').trim();
+                        name = name.replace(/\\s+/g, ' ').trim();
+                        channels.push({{
+                            id: channelId,
+                            name: name || `channel-${{channelId}}`,
+                            href: link.href
+                        }});
+                    }}
+                }}
+            }});
+            return channels;
+        }})()
+    """
+
+
+async def _open_guild_sidebar(state: ClientState, guild_id: str) -> ClientState:
+    state = await _login(state)
+    state = await _goto(
+        state,
+        f"https://discord.com/channels/{guild_id}",
+        f'a[href^="/channels/{guild_id}/"]',
+    )
+    if not state.page:
+        raise RuntimeError("Browser page not initialized")
+    try:
+        await state.page.wait_for_selector(
+            f'a[href*="/channels/{guild_id}/"]', timeout=15000 + state.extra_wait_ms
+        )
+    except Exception:
+        logger.debug("No channel links appeared in the sidebar")
+    await wait_for_quiet(state.page, timeout_ms=1000 + state.extra_wait_ms)
+    return state
+
+
+async def get_sidebar_channels(
     state: ClientState, guild_id: str
 ) -> tuple[ClientState, list[DiscordChannel]]:
-    state = await _login(state)
+    """Channels listed in the guild's sidebar, without opening Browse Channels.
+
+    Cheap enough to check a cached channel list for additions.
+    """
+    state = await _open_guild_sidebar(state, guild_id)
     if not state.page:
         raise RuntimeError("Browser page not initialized")
+    sidebar = await state.page.evaluate(_extract_channels_js(guild_id))
+    return state, [
+        DiscordChannel(id=ch["id"], name=ch["name"], type=0, guild_id=guild_id)
+        for ch in sidebar
+    ]
 
-    await state.page.goto(
-        f"https://discord.com/channels/{guild_id}", wait_until="domcontentloaded"
-    )
-    await state.page.wait_for_timeout(1000 + state.extra_wait_ms)
-
-    # Helper function to extract channels
-    def extract_channels_js() -> str:
-        return f"""
-            (() => {{
-                const channels = [];
-                const seenIds = new Set();
-                const links = document.querySelectorAll('a[href*="/channels/"]');
-                
-                links.forEach(link => {{
-                    const match = link.href.match(/\\/channels\\/{guild_id}\\/([0-9]+)/);
-                    if (match) {{
-                        const channelId = match[1];
-                        if (!seenIds.has(channelId)) {{
-                            seenIds.add(channelId);
-                            let name = link.textContent?.trim() || '';
-                            name = name.replace(/^[^a-zA-Z0-9#-_]+/, '').trim();
-                            name = name.replace(/\\s+/g, ' ').trim();
-                            channels.push({{
-                                id: channelId,
-                                name: name || `channel-${{channelId}}`,
-                                href: link.href
-                            }});
-                        }}
-                    }}
-                }});
-                return channels;
-            }})()
-        """
+
+async def get_guild_channels(
+    state: ClientState, guild_id: str
+) -> tuple[ClientState, list[DiscordChannel]]:
+    state = await _open_guild_sidebar(state, guild_id)
+    if not state.page:
+        raise RuntimeError("Browser page not initialized")
 
     # Step 1: Get original channels
     logger.debug("Getting original channels")
-    original_channels = await state.page.evaluate(extract_channels_js())
+    original_channels = await state.page.evaluate(_extract_channels_js(guild_id))
     logger.debug(f"Found {len(original_channels)} original channels")
 
     # Step 2: Click Browse Channels and get additional channels
@@ -333,7 +659,9 @@ async def get_guild_channels(
         )
         if browse_element and await browse_element.is_visible():
             await browse_element.click()
-            await state.page.wait_for_timeout(5000)
+            await wait_for_quiet(
+                state.page, quiet_ms=500, timeout_ms=5000 + state.extra_wait_ms
+            )
             logger.debug("Clicked Browse Channels")
 
             # Scroll all scrollable elements to load hidden channels
@@ -342,9 +670,11 @@ async def get_guild_channels(
                     .filter(el => el.scrollHeight > el.clientHeight + 5)
                     .forEach(el => el.scrollTop = el.scrollHeight)
             """)
-            await state.page.wait_for_timeout(3000)
+            await wait_for_quiet(
+                state.page, quiet_ms=300, timeout_ms=3000 + state.extra_wait_ms
+            )
 
-            browse_channels = await state.page.evaluate(extract_channels_js())
+            browse_channels = await state.page.evaluate(_extract_channels_js(guild_id))
             logger.debug(f"Found {len(browse_channels)} browse channels")
     except Exception as e:
         logger.debug(f"Browse Channels failed: {e}")
@@ -373,138 +703,426 @@ async def get_guild_channels(
     return state, channels
 
 
-async def _extract_message_data(
-    element, channel_id: str, collected: int
-) -> DiscordMessage | None:
+def _parse_timestamp(value: str | None) -> datetime | None:
     try:
-        message_id = (
-            await element.get_attribute("id") or f"message-{collected}"
-        ).replace("chat-messages-", "")
-
-        content = ""
-        for selector in [
-            '[class*="messageContent"]',
-            '[class*="markup"]',
-            ".messageContent",
-        ]:
-            content_elem = await element.query_selector(selector)
-            if content_elem and (text := await content_elem.text_content()):
-                content = text.strip()
-                break
+        return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+    except ValueError:
+        return None
 
-        author_name = "Unknown"
-        for selector in ['[class*="username"]', '[class*="authorName"]', ".username"]:
-            author_elem = await element.query_selector(selector)
-            if author_elem and (name := await author_elem.text_content()):
-                author_name = name.strip()
-                break
 
-        timestamp_elem = await element.query_selector("time")
-        timestamp_str = (
-            await timestamp_elem.get_attribute("datetime") if timestamp_elem else None
-        )
-        timestamp = (
-            datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-            if timestamp_str
-            else datetime.now(timezone.utc)
-        )
+def _message_timestamp(message_id: str, fallback: str | None = None) -> datetime | None:
+    """Creation time from the message's snowflake ID, else an ISO timestamp."""
+    if parse_snowflake(message_id) is not None:
+        return snowflake_to_datetime(message_id)
+    return _parse_timestamp(fallback)
 
-        attachments = [
-            href
-            for att in await element.query_selector_all('a[href*="cdn.discordapp.com"]')
-            if (href := await att.get_attribute("href"))
-        ]
 
-        if not content and not attachments:
+def _message_from_api(data: dict, channel_id: str) -> DiscordMessage | None:
+    """Build a message from an object in Discord's messages API response."""
+    try:
+        attachments = [a["url"] for a in data.get("attachments") or [] if a.get("url")]
+        embeds = [
+            {
+                "title": e.get("title"),
+                "url": e.get("url"),
+                "description": e.get("description"),
+            }
+            for e in data.get("embeds") or []
+            if e.get("title") or e.get("url") or e.get("description")
+        ]
+        stickers = [s["name"] for s in data.get("sticker_items") or [] if s.get("name")]
+        if not (data.get("content") or attachments or embeds or stickers):
             return None
-
+        author = data.get("author") or {}
+        reference = data.get("message_reference") or {}
         return DiscordMessage(
-            id=message_id,
-            content=content,
-            author_name=author_name,
-            author_id="unknown",
-            channel_id=channel_id,
-            timestamp=timestamp,
+            id=data["id"],
+            content=data.get("content") or "",
+            author_name=author.get("global_name")
+            or author.get("username")
+            or "Unknown",
+            author_id=author.get("id") or "unknown",
+            channel_id=data.get("channel_id") or channel_id,
+            timestamp=_message_timestamp(data["id"], data.get("timestamp")),
             attachments=attachments,
+            edited_timestamp=_parse_timestamp(data.get("edited_timestamp")),
+            reply_to_id=reference.get("message_id"),
+            reactions=[
+                {
+                    "emoji": (r.get("emoji") or {}).get("name") or "",
+                    "count": r.get("count", 0),
+                }
+                for r in data.get("reactions") or []
+            ],
+            embeds=embeds,
+            stickers=stickers,
+            author_username=author.get("username"),
         )
-    except Exception:
+    except (KeyError, TypeError, ValueError) as e:
+        logger.debug(f"Skipping unexpected message payload: {e}")
         return None
 
 
-async def get_channel_messages(
+def _is_start_page(url: str, jumped: bool) -> bool:
+    """Whether a messages API response holds the block a read starts from:
+    the newest messages, or those around the message a read jumped to."""
+    query = parse_qs(urlsplit(url).query)
+    if jumped:
+        return "around" in query
+    return not any(cursor in query for cursor in ("before", "after", "around"))
+
+
+def _api_messages(
+    bodies: list[tuple[str, tp.Any]], channel_id: str
+) -> tuple[list[DiscordMessage], bool, bool]:
+    """Messages from collected API responses, and whether one of them
+    reached the beginning or the end of the channel."""
+    messages = []
+    reached_start = reached_end = False
+    for url, body in bodies:
+        if not isinstance(body, list):
+            continue
+        messages.extend(
+            m for data in body if (m := _message_from_api(data, channel_id))
+        )
+        query = parse_qs(urlsplit(url).query)
+        limit = int(query.get("limit", ["50"])[0])
+        # A page shorter than its limit has nothing left in its direction
+        if "after" in query:
+            reached_end = reached_end or len(body) < limit
+        elif "around" not in query:
+            reached_start = reached_start or len(body) < limit
+    return messages, reached_start, reached_end
+
+
+def _message_from_dom(data: dict, channel_id: str) -> DiscordMessage:
+    """Build a message from a rendered message recorded by the harvester."""
+    return DiscordMessage(
+        id=data["id"],
+        content=data["content"],
+        author_name=data["author_name"],
+        author_id=data["author_id"] or "unknown",
+        channel_id=channel_id,
+        timestamp=_message_timestamp(data["id"], data["timestamp"]),
+        attachments=data["attachments"],
+        edited_timestamp=_parse_timestamp(data["edited_timestamp"]),
+        reply_to_id=data["reply_to_id"],
+        reactions=data["reactions"],
+        embeds=data["embeds"],
+        stickers=data["stickers"],
+    )
+
+
+_JUMP_TO_PRESENT_JS = """
+    () => {
+        const button = Array.from(document.querySelectorAll('button'))
+            .find(b => /jump to present/i.test(b.textContent || ''));
+        button?.click();
+        return Boolean(button);
+    }
+"""
+
+_SCROLL_TO_BOTTOM_JS = """
+    () => {
+        const chat = document.querySelector('[data-list-id="chat-messages"]');
+        if (chat) chat.scrollTo(0, chat.scrollHeight);
+        window.scrollTo(0, document.body.scrollHeight);
+    }
+"""
+
+_SCROLL_TO_EDGE_JS = """
+    (top) => {
+        let scroller = document.querySelector('[data-list-id="chat-messages"]');
+        while (scroller && scroller.scrollHeight <= scroller.clientHeight) {
+            scroller = scroller.parentElement;
+        }
+        if (!scroller) return false;
+        const target = top ? 0 : scroller.scrollHeight - scroller.clientHeight;
+        const moved = Math.abs(scroller.scrollTop - target) > 1;
+        scroller.scrollTop = target;
+        return moved;
+    }
+"""
+
+
+async def _wait_for_history(state: ClientState, tracker: RequestTracker) -> None:
+    """Wait for a scroll step to settle: history fetched and rendered."""
+    if not state.page:
+        return
+    await tracker.wait_for_idle(quiet_ms=100, timeout_ms=5000 + state.extra_wait_ms)
+    await wait_for_quiet(
+        state.page,
+        '[data-list-id="chat-messages"]',
+        quiet_ms=200,
+        timeout_ms=1000 + state.extra_wait_ms,
+    )
+
+
+async def _show_newest(state: ClientState, tracker: RequestTracker) -> None:
+    """Put the chat view at the newest message.
+
+    Discord restores a channel's last scroll position, so a pooled page may
+    show history far back from an earlier read, with newer messages unloaded.
+    """
+    if not state.page:
+        return
+    if await state.page.evaluate(_JUMP_TO_PRESENT_JS):
+        logger.debug("Channel was scrolled back, jumped to present")
+        await _wait_for_history(state, tracker)
+    await state.page.evaluate(_SCROLL_TO_BOTTOM_JS)
+    await _wait_for_history(state, tracker)
+
+
+async def _load_history(
+    state: ClientState, tracker: RequestTracker, older: bool = True
+) -> bool:
+    """Jump to the top (or bottom) of the loaded history so the client loads
+    older (or newer) messages.
+
+    Waits only until the history request completes, or until the DOM settles
+    when the client renders from memory without a request. Returns False if
+    nothing happened: the list could not scroll and no request was made.
+    """
+    if not state.page:
+        return False
+    started = tracker.started
+    moved = await state.page.evaluate(_SCROLL_TO_EDGE_JS, older)
+    fetched = await tracker.wait_for_start(
+        started, timeout_ms=750 + state.extra_wait_ms
+    )
+    if fetched:
+        await tracker.wait_for_idle(quiet_ms=50, timeout_ms=15000 + state.extra_wait_ms)
+    await wait_for_quiet(
+        state.page,
+        '[data-list-id="chat-messages"]',
+        quiet_ms=100,
+        timeout_ms=1000 + state.extra_wait_ms,
+    )
+    return moved or fetched
+
+
+async def iter_channel_messages(
     state: ClientState,
     server_id: str,
     channel_id: str,
     limit: int = 100,
     before: str | None = None,
     after: str | None = None,
-) -> tuple[ClientState, list[DiscordMessage]]:
+    coverage: HistoryCoverage | None = None,
+    oldest_first: bool = False,
+) -> AsyncIterator[list[DiscordMessage]]:
+    """Yield batches of up to `limit` channel messages as they are harvested.
+
+    Each batch is newest first and older than the batches before it, apart
+    from messages posted while reading. `before` and `after` are exclusive
+    message ID bounds; scrolling stops once history older than `after` has
+    been loaded. Stopping iteration early stops scrolling.
+
+    With `before`, the channel is opened at that message through a
+    `/channels/{guild}/{channel}/{message}` link, so reading a window in the
+    past does not scroll through everything newer. `before` may be a
+    snowflake computed from a time rather than a real message ID.
+
+    With `oldest_first`, the channel is opened at `after` instead and read
+    towards the present, so the messages right after `after` come first:
+    batches are then oldest first and newer than the batches before them.
+    """
+    if oldest_first and not after:
+        raise ValueError("An oldest-first read needs an `after` message ID")
+    jump_to = after if oldest_first else before
     state = await _login(state)
     if not state.page:
         raise RuntimeError("Browser page not initialized")
-
-    await state.page.goto(
-        f"https://discord.com/channels/{server_id}/{channel_id}",
-        wait_until="domcontentloaded",
+    url = f"https://discord.com/channels/{server_id}/{channel_id}"
+    if jump_to:
+        url += f"/{jump_to}"
+    # An in-app navigation to the open route does nothing, not even the jump
+    already_open = urlsplit(state.page.url).path == urlsplit(url).path
+    # Listen before navigating so the channel's first history fetch is captured
+    collector = collect_responses(
+        state.page, rf"/api/v\d+/channels/{channel_id}/messages(\?|$)"
     )
-    await state.page.wait_for_selector('[data-list-id="chat-messages"]', timeout=15000)
+    tracker = track_requests(state.page, _MESSAGES_API_PATTERN)
+    try:
+        state = await _goto(state, url, f'[id^="chat-messages-{channel_id}-"]')
+        if not state.page:
+            raise RuntimeError("Browser page not initialized")
+        if jump_to and already_open:
+            await state.page.reload(wait_until="domcontentloaded")
+        await state.page.wait_for_selector(
+            '[data-list-id="chat-messages"]', timeout=15000
+        )
+        if jump_to:
+            # The jump placed the view at the message
+            await _wait_for_history(state, tracker)
+        else:
+            await _show_newest(state, tracker)
+
+        # Only history contiguous with where the read starts may count, so
+        # anything loaded for a position the page was left at is dropped
+        start_pages = [
+            (page_url, body)
+            for page_url, body in await collector.drain()
+            if _is_start_page(page_url, jumped=bool(jump_to))
+        ]
+        harvester = await harvest_messages(state.page, channel_id)
+        try:
+            async for batch in _scroll_channel_messages(
+                state,
+                tracker,
+                collector,
+                start_pages,
+                harvester,
+                channel_id,
+                limit,
+                before,
+                after,
+                coverage or HistoryCoverage(),
+                oldest_first,
+            ):
+                yield batch
+        finally:
+            await harvester.stop()
+    finally:
+        tracker.stop()
+        collector.stop()
 
-    # Scroll to bottom for newest messages
-    await state.page.evaluate("""
-        const chat = document.querySelector('[data-list-id="chat-messages"]');
-        if (chat) chat.scrollTo(0, chat.scrollHeight);
-        window.scrollTo(0, document.body.scrollHeight);
-    """)
-    await state.page.wait_for_timeout(2000)
 
+async def get_channel_messages(
+    state: ClientState,
+    server_id: str,
+    channel_id: str,
+    limit: int = 100,
+    before: str | None = None,
+    after: str | None = None,
+) -> tuple[ClientState, list[DiscordMessage]]:
+    """Read up to `limit` messages from a channel, newest first.
+
+    `before` and `after` are exclusive message ID bounds. Scrolling stops as
+    soon as history older than `after` has been loaded.
+    """
     messages = []
-    seen_ids = set()
+    async for batch in iter_channel_messages(
+        state, server_id, channel_id, limit, before, after
+    ):
+        messages.extend(batch)
+    return state, sorted(messages, key=lambda m: int(m.id), reverse=True)[:limit]
 
-    for attempt in range(10):
-        elements = await state.page.query_selector_all(
-            '[data-list-id="chat-messages"] [id^="chat-messages-"]'
-        )
-        if not elements:
-            await state.page.keyboard.press("PageUp")
-            await state.page.wait_for_timeout(1000)
-            continue
 
-        for element in reversed(elements):
-            if len(messages) >= limit:
-                break
-            try:
-                message = await _extract_message_data(
-                    element, channel_id, len(seen_ids)
-                )
-                if message and message.id not in seen_ids:
-                    if before and message.id >= before:
-                        continue
-                    if after and message.id <= after:
-                        continue
-                    seen_ids.add(message.id)
-                    messages.append(message)
-            except Exception:
-                continue
+async def _scroll_channel_messages(
+    state: ClientState,
+    tracker: RequestTracker,
+    collector: ResponseCollector,
+    start_pages: list[tuple[str, tp.Any]],
+    harvester: MessageHarvester,
+    channel_id: str,
+    limit: int,
+    before: str | None,
+    after: str | None,
+    coverage: HistoryCoverage,
+    oldest_first: bool,
+) -> AsyncIterator[list[DiscordMessage]]:
+    """Scroll from the start position, yielding in-range messages.
+
+    Everything collected here was loaded by scrolling back (or, oldest
+    first, forward) from the start position, so `found` is one contiguous
+    block of history.
+    """
+    if not state.page:
+        raise RuntimeError("Browser page not initialized")
 
-        if len(messages) >= limit or not elements:
-            break
-        await state.page.keyboard.press("PageUp")
-        await state.page.wait_for_timeout(1000)
+    # Messages from Discord's own API responses are exact; rendered messages
+    # recorded by the harvester only fill in those no response covered. Keyed
+    # by snowflake, so range checks and ordering are integer compares.
+    found: dict[int, DiscordMessage] = {}
+    before_id = parse_snowflake(before)
+    after_id = parse_snowflake(after)
+    # Smallest ID still wanted; once older history is loaded, stop scrolling
+    floor_id = after_id + 1 if after_id is not None else None
+
+    def in_range(snowflake: int) -> bool:
+        if before_id is not None and snowflake >= before_id:
+            return False
+        return floor_id is None or snowflake >= floor_id
+
+    def add(message: DiscordMessage, exact: bool) -> None:
+        if (snowflake := parse_snowflake(message.id)) is None:
+            return
+        if exact:
+            found[snowflake] = message
+        else:
+            found.setdefault(snowflake, message)
+
+    yielded: set[int] = set()
 
-    return state, sorted(messages, key=lambda m: m.timestamp, reverse=True)[:limit]
+    # Keep loading history until enough messages are found, the bound or the
+    # beginning (or end) of the channel is reached, or scrolling stalls
+    stalled_steps = 0
+    while True:
+        known = len(found)
+        api_messages, reached_start, reached_end = _api_messages(
+            start_pages + await collector.drain(), channel_id
+        )
+        start_pages = []
+        for message in api_messages:
+            add(message, exact=True)
+        for data in await harvester.drain():
+            add(_message_from_dom(data, channel_id), exact=False)
+
+        fresh = sorted(
+            (s for s in found if s not in yielded and in_range(s)),
+            reverse=not oldest_first,
+        )[: limit - len(yielded)]
+        if fresh:
+            yielded.update(fresh)
+            if oldest_first:
+                # The read started at the floor and has reached this far
+                coverage.oldest_id = floor_id
+                coverage.newest_id = max(yielded) + 1
+            else:
+                coverage.oldest_id = min(yielded)
+            yield [found[snowflake] for snowflake in fresh]
+
+        if len(yielded) >= limit:
+            break
+        if oldest_first:
+            if before_id is not None and found and max(found) >= before_id:
+                logger.debug("Loaded history reaches the upper bound, stopping scroll")
+                coverage.oldest_id, coverage.newest_id = floor_id, None
+                break
+            if reached_end:
+                logger.debug("Reached the newest message of the channel")
+                coverage.oldest_id, coverage.newest_id = floor_id, None
+                break
+        else:
+            if floor_id is not None and found and min(found) < floor_id:
+                logger.debug("Loaded history reaches the lower bound, stopping scroll")
+                coverage.oldest_id = floor_id
+                break
+            if reached_start:
+                logger.debug("Reached the beginning of the channel")
+                coverage.oldest_id = 0
+                break
+        stalled_steps = stalled_steps + 1 if len(found) == known else 0
+        if stalled_steps >= _MAX_STALLED_SCROLLS:
+            logger.debug("No more messages are loading, stopping scroll")
+            break
+        if not await _load_history(state, tracker, older=not oldest_first) and found:
+            logger.debug("History cannot scroll further, stopping scroll")
+            break
 
 
 async def send_message(
     state: ClientState, server_id: str, channel_id: str, content: str
 ) -> tuple[ClientState, str]:
     state = await _login(state)
-    if not state.page:
-        raise RuntimeError("Browser page not initialized")
-
-    await state.page.goto(
+    state = await _goto(
+        state,
         f"https://discord.com/channels/{server_id}/{channel_id}",
-        wait_until="domcontentloaded",
+        f'[id^="chat-messages-{channel_id}-"]',
     )
+    if not state.page:
+        raise RuntimeError("Browser page not initialized")
     await state.page.wait_for_selector('[data-slate-editor="true"]', timeout=10000)
 
     message_input = await state.page.query_selector('[data-slate-editor="true"]')
@@ -512,10 +1130,23 @@ async def send_message(
         raise RuntimeError("Could not find message input")
 
     await message_input.fill(content)
-    await state.page.keyboard.press("Enter")
-    await asyncio.sleep(1)
+    message_id = f"sent-{int(datetime.now().timestamp())}"
+    try:
+        async with state.page.expect_response(
+            lambda r: (
+                r.request.method == "POST"
+                and f"/channels/{channel_id}/messages" in r.url
+            ),
+            timeout=10000 + state.extra_wait_ms,
+        ) as response_info:
+            await state.page.keyboard.press("Enter")
+        response = await response_info.value
+        if response.ok:
+            message_id = (await response.json()).get("id") or message_id
+    except Exception as e:
+        logger.debug(f"Did not observe the send request completing: {e}")
 
-    return state, f"sent-{int(datetime.now().timestamp())}"
+    return state, message_id
 
 
 @dc.dataclass(frozen=True)
@@ -529,7 +1160,9 @@ class MessageContext:
     channel_id: str
 
 
-async def _navigate_to_search_page(page, target_page: int) -> bool:
+async def _navigate_to_search_page(
+    page, target_page: int, extra_wait_ms: int = 0
+) -> bool:
     """Navigate to a specific search result page.
 
     Tries in order:
@@ -544,14 +1177,14 @@ async def _navigate_to_search_page(page, target_page: int) -> bool:
     page_button = await page.query_selector(f'button:has-text("Page {target_page}")')
     if page_button and await page_button.is_visible():
         await page_button.click()
-        await page.wait_for_timeout(1000)
+        await wait_for_quiet(page, quiet_ms=200, timeout_ms=1000 + extra_wait_ms)
         return True
 
     # Method 2: Try ellipsis input (for large result sets)
     ellipsis = await page.query_selector('button:has-text("...")')
     if ellipsis and await ellipsis.is_visible():
         await ellipsis.click()
-        await page.wait_for_timeout(500)
+        await wait_for_quiet(page, quiet_ms=100, timeout_ms=500 + extra_wait_ms)
 
         # Look for input field that appears
         page_input = await page.query_selector(
@@ -560,7 +1193,7 @@ async def _navigate_to_search_page(page, target_page: int) -> bool:
         if page_input:
             await page_input.fill(str(target_page))
             await page_input.press("Enter")
-            await page.wait_for_timeout(1000)
+            await wait_for_quiet(page, quiet_ms=200, timeout_ms=1000 + extra_wait_ms)
             return True
 
     # Method 3: Sequential Next clicks
@@ -568,13 +1201,60 @@ async def _navigate_to_search_page(page, target_page: int) -> bool:
         next_button = await page.query_selector('button:has-text("Next")')
         if next_button and await next_button.is_visible():
             await next_button.click()
-            await page.wait_for_timeout(800)
+            await wait_for_quiet(page, quiet_ms=200, timeout_ms=800 + extra_wait_ms)
         else:
             return False  # Can't navigate further
 
     return True
 
 
+def build_search_query(
+    query: str,
+    in_channels: list[str] | None = None,
+    from_users: list[str] | None = None,
+    mentions_users: list[str] | None = None,
+    has_filters: list[str] | None = None,
+    before: str | None = None,
+    after: str | None = None,
+    author_type: str | None = None,
+    pinned: bool | None = None,
+) -> str:
+    """Build the text typed into Discord's search box."""
+    parts = [query] if query else []
+    if in_channels:
+        for channel in in_channels:
+            parts.append(f"in: {channel}")
+    if from_users:
+        for user in from_users:
+            parts.append(f"from: {user}")
+    if mentions_users:
+        for user in mentions_users:
+            parts.append(f"mentions: {user}")
+    if has_filters:
+        for has_type in has_filters:
+            parts.append(f"has: {has_type}")
+    if before:
+        parts.append(f"before: {before}")
+    if after:
+        parts.append(f"after: {after}")
+    if author_type:
+        parts.append(f"authorType: {author_type}")
+    if pinned:
+        parts.append("pinned: true")
+    return " ".join(parts)
+
+
+def _search_results_from_api(body: dict) -> list[DiscordMessage]:
+    """Hits from a search API response, in result order."""
+    results = []
+    for group in body["messages"] or []:
+        # Each result is a list holding the hit, formerly with context
+        hit = next((m for m in group if m.get("hit")), group[0] if group else None)
+        if hit and (message := _message_from_api(hit, hit.get("channel_id", ""))):
+            results.append(message)
+    return results
+
+
 async def search_messages(
     state: ClientState,
     server_id: str,
@@ -611,75 +1291,123 @@ async def search_messages(
     if not state.page:
         raise RuntimeError("Browser page not initialized")
 
-    # Build search query with filters
-    parts = [query] if query else []
-    if in_channels:
-        for channel in in_channels:
-            parts.append(f"in: {channel}")
-    if from_users:
-        for user in from_users:
-            parts.append(f"from: {user}")
-    if mentions_users:
-        for user in mentions_users:
-            parts.append(f"mentions: {user}")
-    if has_filters:
-        for has_type in has_filters:
-            parts.append(f"has: {has_type}")
-    if before:
-        parts.append(f"before: {before}")
-    if after:
-        parts.append(f"after: {after}")
-    if author_type:
-        parts.append(f"authorType: {author_type}")
-    if pinned:
-        parts.append("pinned: true")
-
-    full_query = " ".join(parts)
+    full_query = build_search_query(
+        query,
+        in_channels,
+        from_users,
+        mentions_users,
+        has_filters,
+        before,
+        after,
+        author_type,
+        pinned,
+    )
     logger.debug(f"Searching for '{full_query}' in server {server_id}")
 
     # Navigate to the server
-    await state.page.goto(
+    state = await _goto(
+        state,
         f"https://discord.com/channels/{server_id}",
-        wait_until="domcontentloaded",
+        f'a[href^="/channels/{server_id}/"]',
+    )
+    if not state.page:
+        raise RuntimeError("Browser page not initialized")
+
+    return state, await _run_search(
+        state, full_query, page, limit, in_channels[0] if in_channels else ""
     )
 
+
+def _is_search_response(response: Response, offset: int) -> bool:
+    if (
+        response.status != 200
+        or response.request.method != "GET"
+        or not re.search(_SEARCH_API_PATTERN, response.url)
+    ):
+        return False
+    query = parse_qs(urlsplit(response.url).query)
+    return int(query.get("offset", ["0"])[0]) == offset
+
+
+async def _submit_search(
+    state: ClientState, full_query: str, page: int
+) -> tp.Any | None:
+    """Search in the open guild and return the API response body for `page`.
+
+    Discord keeps the last search's text and results per guild, so the box
+    is cleared first and the search request itself is awaited rather than
+    result nodes, which may still be the previous search's. Returns None
+    if the requested page can't be reached.
+    """
+    if not state.page:
+        raise RuntimeError("Browser page not initialized")
+    timeout = 15000 + state.extra_wait_ms
+
     # Wait for Discord UI to load and search box to be available
     await state.page.wait_for_selector(
         '[role="combobox"]', state="visible", timeout=15000
     )
-    await state.page.wait_for_timeout(200 + state.extra_wait_ms)
-
-    # Click the search box
     search_box = await state.page.query_selector('[role="combobox"]')
     if not search_box:
         raise RuntimeError("Could not find search box")
     await search_box.click()
-    await state.page.wait_for_timeout(200 + state.extra_wait_ms)
-
-    # Type the search query
+    await state.page.keyboard.press("ControlOrMeta+a")
+    await state.page.keyboard.press("Backspace")
     await state.page.keyboard.type(full_query, delay=50)
-    await state.page.wait_for_timeout(200 + state.extra_wait_ms)
+    await wait_for_quiet(state.page, quiet_ms=100, timeout_ms=200 + state.extra_wait_ms)
 
-    # Submit search
-    await state.page.keyboard.press("Enter")
+    async with state.page.expect_response(
+        lambda r: _is_search_response(r, 0), timeout=timeout
+    ) as first:
+        await state.page.keyboard.press("Enter")
+    response = await first.value
 
-    # Wait for results to load - use class-based selector
-    try:
-        await state.page.wait_for_selector(
-            '[class*="searchResult"]', state="visible", timeout=10000
+    if page > 1:
+        # Discord shows 25 results per page
+        offset = (page - 1) * 25
+        waiter = asyncio.ensure_future(
+            state.page.wait_for_event(
+                "response",
+                lambda r: _is_search_response(r, offset),
+                timeout=timeout,
+            )
         )
-    except Exception:
-        logger.debug("No search results found or timeout waiting for results")
-        return state, []
+        await wait_for_quiet(
+            state.page, quiet_ms=200, timeout_ms=1500 + state.extra_wait_ms
+        )
+        if not await _navigate_to_search_page(state.page, page, state.extra_wait_ms):
+            waiter.cancel()
+            logger.debug(f"Could not navigate to page {page}")
+            return None
+        response = await waiter
 
-    await state.page.wait_for_timeout(500 + state.extra_wait_ms)
+    body = await response.json()
+    # Let the result pane render the new results for callers that read it
+    await wait_for_quiet(
+        state.page, quiet_ms=200, timeout_ms=1500 + state.extra_wait_ms
+    )
+    return body
 
-    # Navigate to requested page if not page 1
-    if page > 1:
-        navigated = await _navigate_to_search_page(state.page, page)
-        if not navigated:
-            logger.debug(f"Could not navigate to page {page}")
-        await state.page.wait_for_timeout(1000)
+
+async def _run_search(
+    state: ClientState,
+    full_query: str,
+    page: int,
+    limit: int,
+    default_channel: str,
+) -> list[DiscordMessage]:
+    if not state.page:
+        raise RuntimeError("Browser page not initialized")
+
+    body = await _submit_search(state, full_query, page)
+    if body is None:
+        return []
+    # The API response has real message and channel IDs; the result pane is
+    # only read when the response has an unexpected shape
+    if isinstance(body, dict) and "messages" in body:
+        results = _search_results_from_api(body)
+        logger.debug(f"Found {len(results)} search results in the API response")
+        return results[:limit]
 
     # Extract search results via JavaScript
     messages = []
@@ -732,8 +1460,13 @@ async def search_messages(
                     const channelEl = el.querySelector('[class*="channel"]');
                     const channel = channelEl?.textContent?.trim() || '';
 
+                    // Message snowflake from the rendered message's element id
+                    const idEl = el.querySelector('[id^="chat-messages-"], [id^="message-content-"]');
+                    const messageId = idEl?.id.match(/(\\d+)$/)?.[1] || '';
+
                     if (content) {
                         results.push({
+                            id: messageId,
                             author: author,
                             content: content.substring(0, 500),
                             timestamp: timestamp,
@@ -758,26 +1491,15 @@ async def search_messages(
                 continue
             seen_content.add(content_key)
 
-            # Parse timestamp if available
-            timestamp = datetime.now(timezone.utc)
-            if result.get("fullTimestamp"):
-                try:
-                    # Discord format: "Saturday, December 27, 2025 at 8:52 PM"
-                    ts_str = result["fullTimestamp"].replace(" at ", " ")
-                    timestamp = datetime.strptime(ts_str, "%A, %B %d, %Y %I:%M %p")
-                    timestamp = timestamp.replace(tzinfo=timezone.utc)
-                except (ValueError, AttributeError):
-                    pass
-
+            message_id = result.get("id") or f"search-{len(messages)}"
             messages.append(
                 DiscordMessage(
-                    id=f"search-{len(messages)}",
+                    id=message_id,
                     content=result["content"],
                     author_name=result["author"],
                     author_id="unknown",
-                    channel_id=result.get("channel")
-                    or (in_channels[0] if in_channels else ""),
-                    timestamp=timestamp,
+                    channel_id=result.get("channel") or default_channel,
+                    timestamp=_message_timestamp(message_id, result.get("timestamp")),
                     attachments=[],
                 )
             )
@@ -800,11 +1522,13 @@ async def search_messages(
             }
             """
         )
-        await state.page.wait_for_timeout(1000)
+        await wait_for_quiet(
+            state.page, quiet_ms=200, timeout_ms=1000 + state.extra_wait_ms
+        )
         scroll_attempts += 1
 
     logger.debug(f"Found {len(messages)} search results via DOM scraping")
-    return state, messages[:limit]
+    return messages[:limit]
 
 
 async def get_search_result_context(
@@ -838,55 +1562,21 @@ async def get_search_result_context(
     if not state.page:
         raise RuntimeError("Browser page not initialized")
 
-    # Build search query
-    parts = [query] if query else []
-    if in_channels:
-        for channel in in_channels:
-            parts.append(f"in: {channel}")
-    if from_users:
-        for user in from_users:
-            parts.append(f"from: {user}")
-
-    full_query = " ".join(parts)
+    full_query = build_search_query(query, in_channels, from_users)
     logger.debug(f"Getting context for '{full_query}' result {result_index}")
 
     # Navigate to server and search
-    await state.page.goto(
+    state = await _goto(
+        state,
         f"https://discord.com/channels/{server_id}",
-        wait_until="domcontentloaded",
-    )
-
-    # Wait for Discord UI to load and search box to be available
-    await state.page.wait_for_selector(
-        '[role="combobox"]', state="visible", timeout=15000
+        f'a[href^="/channels/{server_id}/"]',
     )
-    await state.page.wait_for_timeout(200 + state.extra_wait_ms)
-
-    # Click search and enter query
-    search_box = await state.page.query_selector('[role="combobox"]')
-    if not search_box:
-        raise RuntimeError("Could not find search box")
-    await search_box.click()
-    await state.page.wait_for_timeout(500)
-    await state.page.keyboard.type(full_query, delay=50)
-    await state.page.keyboard.press("Enter")
+    if not state.page:
+        raise RuntimeError("Browser page not initialized")
 
-    # Wait for results
-    try:
-        await state.page.wait_for_selector(
-            '[class*="searchResult"]', state="visible", timeout=10000
-        )
-    except Exception:
-        logger.debug("No search results found")
+    if await _submit_search(state, full_query, page) is None:
         return state, None
 
-    await state.page.wait_for_timeout(1500)
-
-    # Navigate to page if needed
-    if page > 1:
-        await _navigate_to_search_page(state.page, page)
-        await state.page.wait_for_timeout(1000)
-
     # Find search result containers (DIVs only, not wrapper SECTION or UL)
     result_locator = state.page.locator('div[class*="searchResult"]')
     result_count = await result_locator.count()
@@ -900,7 +1590,13 @@ async def get_search_result_context(
     target_result = result_locator.nth(result_index)
     await target_result.scroll_into_view_if_needed()
     await target_result.click(timeout=5000)
-    await state.page.wait_for_timeout(2000)
+    try:
+        await state.page.wait_for_url(
+            re.compile(r"/channels/[^/]+/\d+/\d+"),
+            timeout=2000 + state.extra_wait_ms,
+        )
+    except Exception:
+        logger.debug(f"Jump did not reach a message link, at {state.page.url}")
 
     # Extract channel info from URL
     url = state.page.url
@@ -909,9 +1605,56 @@ async def get_search_result_context(
     channel_id = url_parts[-2] if len(url_parts) >= 2 else ""
     target_message_id = url_parts[-1] if len(url_parts) >= 1 else ""
 
+    return state, await _extract_context(
+        state,
+        channel_id,
+        target_message_id,
+        before_count,
+        after_count,
+        in_channels[0] if in_channels else "",
+    )
+
+
+async def get_message_context(
+    state: ClientState,
+    server_id: str,
+    channel_id: str,
+    message_id: str,
+    before_count: int = 5,
+    after_count: int = 5,
+    channel_name: str = "",
+) -> tuple[ClientState, MessageContext | None]:
+    """Open a message through its link and get the messages around it."""
+    state = await _login(state)
+    state = await _goto(
+        state,
+        f"https://discord.com/channels/{server_id}/{channel_id}/{message_id}",
+        f'[id^="chat-messages-{channel_id}-"]',
+    )
+    return state, await _extract_context(
+        state, channel_id, message_id, before_count, after_count, channel_name
+    )
+
+
+async def _extract_context(
+    state: ClientState,
+    channel_id: str,
+    target_message_id: str,
+    before_count: int,
+    after_count: int,
+    channel_name: str,
+) -> MessageContext | None:
+    if not state.page:
+        raise RuntimeError("Browser page not initialized")
+
     # Wait for messages to load
     await state.page.wait_for_selector('[id^="chat-messages-"]', timeout=10000)
-    await state.page.wait_for_timeout(1000)
+    await wait_for_quiet(
+        state.page,
+        '[data-list-id="chat-messages"]',
+        quiet_ms=200,
+        timeout_ms=1000 + state.extra_wait_ms,
+    )
 
     # Extract messages from the channel view
     messages_data = await state.page.evaluate(
@@ -921,7 +1664,7 @@ async def get_search_result_context(
             const messageElements = document.querySelectorAll('[id^="chat-messages-"]');
 
             messageElements.forEach((el, index) => {
-                const id = el.id.replace('chat-messages-', '');
+                const id = el.id.split('-').pop();
 
                 // Get author
                 const usernameEl = el.querySelector('[class*="username"]');
@@ -953,7 +1696,7 @@ async def get_search_result_context(
 
     if not messages_data:
         logger.debug("No messages found in channel view")
-        return state, None
+        return None
 
     # Find the target message (usually highlighted or the one we jumped to)
     # The target is typically in the middle of visible messages
@@ -961,25 +1704,19 @@ async def get_search_result_context(
 
     # Try to find by message ID if available
     for i, msg in enumerate(messages_data):
-        if target_message_id and target_message_id in msg["id"]:
+        if target_message_id and target_message_id == msg["id"]:
             target_idx = i
             break
 
     # Build message lists
     def make_message(data: dict) -> DiscordMessage:
-        ts = datetime.now(timezone.utc)
-        if data.get("timestamp"):
-            try:
-                ts = datetime.fromisoformat(data["timestamp"].replace("Z", "+00:00"))
-            except ValueError:
-                pass
         return DiscordMessage(
             id=data["id"],
             content=data["content"],
             author_name=data["author"],
             author_id="unknown",
             channel_id=channel_id,
-            timestamp=ts,
+            timestamp=_message_timestamp(data["id"], data.get("timestamp")),
             attachments=[],
         )
 
@@ -992,9 +1729,8 @@ async def get_search_result_context(
         make_message(m) for m in messages_data[target_idx + 1 : after_end]
     ]
 
-    # Get channel name from the URL or header
-    # The channel name is often in the page title or we can parse from filter we used
-    channel_name = in_channels[0] if in_channels else ""
+    # Get channel name from the header unless the caller knows it, e.g.
+    # from the channel filter used to search
     if not channel_name:
         # Try to get from header - look for the first distinct title text
         channel_name = await state.page.evaluate(
@@ -1025,4 +1761,4 @@ async def get_search_result_context(
     logger.debug(
         f"Got context: {len(messages_before)} before, target, {len(messages_after)} after"
     )
-    return state, context
+    return context
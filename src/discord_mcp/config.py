@@ -12,6 +12,30 @@ class DiscordConfig(tp.NamedTuple):
     max_messages_per_channel: int
     default_hours_back: int
     extra_wait_ms: int
+    pool_size: int = 3
+    pool_max_wait_s: float = 60.0
+    pool_health_check: bool = True
+    login_cache_ttl_s: float = 900.0
+    block_resources: bool = True
+    blocked_resource_types: tuple[str, ...] = ("image", "media", "font")
+    blocked_hosts: tuple[str, ...] = ()
+    allowed_hosts: tuple[str, ...] = ()
+    unblock_resources_on_send: bool = False
+    profile_dir: str | None = None
+    recycle_page_after_ops: int = 200
+    recycle_page_after_s: float = 3600.0
+    recycle_page_max_heap_mb: float = 512.0
+    recycle_browser_after_ops: int = 2000
+    recycle_browser_after_s: float = 21600.0
+    shard_count: int = 1
+    store_path: str | None = None
+    guild_cache_ttl_s: float = 86400.0
+    channel_cache_ttl_s: float = 3600.0
+    search_cache_ttl_s: float = 300.0
+
+
+def _split_list(value: str) -> tuple[str, ...]:
+    return tuple(item.strip() for item in value.split(",") if item.strip())
 
 
 def load_config() -> DiscordConfig:
@@ -35,6 +59,40 @@ def load_config() -> DiscordConfig:
     max_messages = int(os.getenv("MAX_MESSAGES_PER_CHANNEL", "200"))
     hours_back = int(os.getenv("DEFAULT_HOURS_BACK", "24"))
     extra_wait_ms = int(os.getenv("DISCORD_EXTRA_WAIT_MS", "0"))
+    pool_size = max(1, int(os.getenv("DISCORD_POOL_SIZE", "3")))
+    pool_max_wait_s = float(os.getenv("DISCORD_POOL_MAX_WAIT_S", "60"))
+    pool_health_check = os.getenv("DISCORD_POOL_HEALTH_CHECK", "true").lower() == "true"
+    login_cache_ttl_s = float(os.getenv("DISCORD_LOGIN_CACHE_TTL_S", "900"))
+    block_resources = os.getenv("DISCORD_BLOCK_RESOURCES", "true").lower() == "true"
+    blocked_resource_types = _split_list(
+        os.getenv("DISCORD_BLOCKED_RESOURCE_TYPES", "image,media,font")
+    )
+    blocked_hosts = _split_list(os.getenv("DISCORD_BLOCKED_HOSTS", ""))
+    allowed_hosts = _split_list(os.getenv("DISCORD_ALLOWED_HOSTS", ""))
+    unblock_resources_on_send = (
+        os.getenv("DISCORD_UNBLOCK_RESOURCES_ON_SEND", "false").lower() == "true"
+    )
+    profile_dir = os.getenv("DISCORD_PROFILE_DIR") or None
+    recycle_page_after_ops = int(os.getenv("DISCORD_RECYCLE_PAGE_AFTER_OPS", "200"))
+    recycle_page_after_s = float(os.getenv("DISCORD_RECYCLE_PAGE_AFTER_S", "3600"))
+    recycle_page_max_heap_mb = float(
+        os.getenv("DISCORD_RECYCLE_PAGE_MAX_HEAP_MB", "512")
+    )
+    recycle_browser_after_ops = int(
+        os.getenv("DISCORD_RECYCLE_BROWSER_AFTER_OPS", "2000")
+    )
+    recycle_browser_after_s = float(
+        os.getenv("DISCORD_RECYCLE_BROWSER_AFTER_S", "21600")
+    )
+    shard_count = max(1, int(os.getenv("DISCORD_BROWSER_SHARDS", "1")))
+    guild_cache_ttl_s = float(os.getenv("DISCORD_GUILD_CACHE_TTL_S", "86400"))
+    channel_cache_ttl_s = float(os.getenv("DISCORD_CHANNEL_CACHE_TTL_S", "3600"))
+    search_cache_ttl_s = float(os.getenv("DISCORD_SEARCH_CACHE_TTL_S", "300"))
+    # Set to an empty value to disable the local message store
+    store_path = (
+        os.getenv("DISCORD_STORE_PATH", str(Path.home() / ".discord_mcp_messages.db"))
+        or None
+    )
 
     return DiscordConfig(
         email=email,
@@ -44,4 +102,24 @@ def load_config() -> DiscordConfig:
         max_messages_per_channel=max_messages,
         default_hours_back=hours_back,
         extra_wait_ms=extra_wait_ms,
+        pool_size=pool_size,
+        pool_max_wait_s=pool_max_wait_s,
+        pool_health_check=pool_health_check,
+        login_cache_ttl_s=login_cache_ttl_s,
+        block_resources=block_resources,
+        blocked_resource_types=blocked_resource_types,
+        blocked_hosts=blocked_hosts,
+        allowed_hosts=allowed_hosts,
+        unblock_resources_on_send=unblock_resources_on_send,
+        profile_dir=profile_dir,
+        recycle_page_after_ops=recycle_page_after_ops,
+        recycle_page_after_s=recycle_page_after_s,
+        recycle_page_max_heap_mb=recycle_page_max_heap_mb,
+        recycle_browser_after_ops=recycle_browser_after_ops,
+        recycle_browser_after_s=recycle_browser_after_s,
+        shard_count=shard_count,
+        store_path=store_path,
+        guild_cache_ttl_s=guild_cache_ttl_s,
+        channel_cache_ttl_s=channel_cache_ttl_s,
+        search_cache_ttl_s=search_cache_ttl_s,
     )
@@ -0,0 +1,160 @@
+from playwright.async_api import Page
+
+from .logger import logger
+
+_INSTALL_JS = """
+    ({ channelId }) => {
+        window.__discordMcpHarvester?.observer.disconnect();
+        const prefix = `chat-messages-${channelId}-`;
+        const selector = `[id^="${prefix}"]`;
+        const replySelector = '[id^="message-reply-context-"]';
+        const seen = new Set();
+        const buffer = [];
+        const textOf = (element, selectors) => {
+            for (const s of selectors) {
+                const text = element.querySelector(s)?.textContent?.trim();
+                if (text) return text;
+            }
+            return '';
+        };
+        const record = element => {
+            const id = element.id.slice(prefix.length);
+            if (!/^\\d+$/.test(id) || seen.has(id)) return;
+            // A reply also renders the replied-to message's content first
+            const content = textOf(element, [
+                `#message-content-${id}`,
+                '[class*="messageContent"]',
+                '[class*="markup"]',
+                '.messageContent',
+            ]);
+            const attachments = Array.from(
+                element.querySelectorAll('a[href*="cdn.discordapp.com"]'),
+                a => a.getAttribute('href')
+            ).filter(Boolean);
+            const embeds = Array.from(
+                element.querySelectorAll('article[class*="embed"]'),
+                embed => {
+                    const title = embed.querySelector('[class*="embedTitle"]');
+                    return {
+                        title: title?.textContent?.trim() || null,
+                        url: title?.closest('a')?.getAttribute('href')
+                            || title?.querySelector('a')?.getAttribute('href')
+                            || embed.querySelector('a[href]')?.getAttribute('href')
+                            || null,
+                        description: embed.querySelector(
+                            '[class*="embedDescription"]'
+                        )?.textContent?.trim() || null,
+                    };
+                }
+            ).filter(embed => embed.title || embed.url || embed.description);
+            const stickers = Array.from(
+                element.querySelectorAll('[class*="sticker"] img[alt]'),
+                img => img.getAttribute('alt')
+            ).filter(Boolean);
+            // Not marked as seen, so a later render with content is recorded
+            if (!content && !attachments.length && !embeds.length && !stickers.length) {
+                return;
+            }
+            seen.add(id);
+            // Avatars are served from /avatars/{userId}/...; only the first
+            // message of a group shows one
+            const avatar = Array.from(element.querySelectorAll('img[src*="/avatars/"]'))
+                .find(img => !img.closest(replySelector))?.getAttribute('src');
+            const replyContent = element.querySelector(
+                `${replySelector} [id^="message-content-"]`
+            );
+            buffer.push({
+                id,
+                content,
+                author_name: textOf(
+                    element, ['[class*="username"]', '[class*="authorName"]', '.username']
+                ) || 'Unknown',
+                author_id: avatar?.match(/\\/avatars\\/(\\d+)\\//)?.[1] || null,
+                timestamp: element.querySelector('time')?.getAttribute('datetime') || null,
+                edited_timestamp: element.querySelector(
+                    '[class*="edited"] time'
+                )?.getAttribute('datetime') || null,
+                reply_to_id: replyContent?.id.match(/(\\d+)$/)?.[1] || null,
+                attachments,
+                reactions: Array.from(
+                    element.querySelectorAll('[class*="reactions"] [class*="reaction_"]'),
+                    reaction => ({
+                        emoji: reaction.querySelector('img')?.getAttribute('alt')
+                            || reaction.querySelector('[class*="emoji"]')?.textContent?.trim()
+                            || '',
+                        count: parseInt(
+                            reaction.querySelector('[class*="reactionCount"]')?.textContent || '0', 10
+                        ) || 0,
+                    })
+                ).filter(reaction => reaction.emoji),
+                embeds,
+                stickers,
+            });
+        };
+        const scan = node => {
+            if (node.nodeType !== Node.ELEMENT_NODE) return;
+            if (node.matches(selector)) record(node);
+            node.querySelectorAll(selector).forEach(record);
+        };
+        const observer = new MutationObserver(mutations => {
+            for (const mutation of mutations) {
+                const target = mutation.target.nodeType === Node.ELEMENT_NODE
+                    ? mutation.target : mutation.target.parentElement;
+                const message = target?.closest(selector);
+                if (message) record(message);
+                mutation.addedNodes.forEach(scan);
+            }
+        });
+        observer.observe(document.body, { childList: true, subtree: true });
+        scan(document.body);
+        window.__discordMcpHarvester = { observer, buffer };
+    }
+"""
+
+_DRAIN_JS = """
+    () => window.__discordMcpHarvester?.buffer.splice(0) ?? []
+"""
+
+_UNINSTALL_JS = """
+    () => {
+        window.__discordMcpHarvester?.observer.disconnect();
+        delete window.__discordMcpHarvester;
+    }
+"""
+
+
+class MessageHarvester:
+    """Records channel messages in the page as their nodes are mounted.
+
+    Discord's chat list is virtualized, so nodes scrolled out of view are
+    recycled. An in-page MutationObserver records each message as soon as it
+    renders into a page-side buffer; `drain()` returns the messages recorded
+    since the last drain, in mount order, as plain dicts.
+    """
+
+    def __init__(self, page: Page, channel_id: str) -> None:
+        self._page = page
+        self._channel_id = channel_id
+
+    async def start(self) -> "MessageHarvester":
+        await self._page.evaluate(_INSTALL_JS, {"channelId": self._channel_id})
+        return self
+
+    async def drain(self) -> list[dict]:
+        try:
+            return await self._page.evaluate(_DRAIN_JS)
+        except Exception as e:
+            logger.debug(f"Could not drain harvested messages: {e}")
+            return []
+
+    async def stop(self) -> None:
+        try:
+            await self._page.evaluate(_UNINSTALL_JS)
+        except Exception as e:
+            # The page may have navigated or closed
+            logger.debug(f"Could not remove message harvester: {e}")
+
+
+async def harvest_messages(page: Page, channel_id: str) -> MessageHarvester:
+    """Start recording rendered messages; call `stop()` when done."""
+    return await MessageHarvester(page, channel_id).start()
@@ -1,37 +1,251 @@
+from collections.abc import AsyncIterator, Awaitable, Callable
 from datetime import datetime, timezone, timedelta
-from .client import ClientState, DiscordMessage, get_channel_messages
+from .client import (
+    ClientState,
+    DiscordMessage,
+    HistoryCoverage,
+    iter_channel_messages,
+)
 from .logger import logger
+from .snowflake import datetime_to_snowflake, snowflake_bounds
+from .store import (
+    MessageStore,
+    latest_sync_range,
+    load_messages,
+    record_sync_range,
+    save_messages,
+    sync_range_at,
+)
 
 
-async def read_recent_messages(
+def _read_window(
+    hours_back: int,
+    after_id: str | None,
+    before_id: str | None,
+    after_time: datetime | None,
+    before_time: datetime | None,
+) -> tuple[int, int | None]:
+    """Turn a read's bounds into a [floor_id, top_id) snowflake window.
+
+    `top_id` is None for a window that ends at the newest message.
+    """
+    min_id, max_id = snowflake_bounds(after_time, before_time)
+    floors = [] if min_id is None else [min_id]
+    if after_id:
+        floors.append(int(after_id) + 1)
+    tops = [] if max_id is None else [max_id]
+    if before_id:
+        tops.append(int(before_id))
+    if not floors and not tops:
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours_back)
+        logger.debug(f"Cutoff time set to: {cutoff_time}")
+        floors.append(datetime_to_snowflake(cutoff_time))
+    # The tighter of each pair of bounds wins
+    return max(floors, default=0), min(tops, default=None)
+
+
+def _window_bounds(floor_id: int, top_id: int | None) -> tuple[str | None, str | None]:
+    """Exclusive (after, before) message ID bounds for a [floor_id, top_id) window."""
+    return (
+        str(floor_id - 1) if floor_id > 0 else None,
+        str(top_id) if top_id is not None else None,
+    )
+
+
+def iter_recent_messages(
     state: ClientState,
     server_id: str,
     channel_id: str,
     hours_back: int = 24,
     max_messages: int = 1000,
-) -> tuple[ClientState, list[DiscordMessage]]:
-    logger.debug(
-        f"read_recent_messages called for server {server_id}, channel {channel_id}, {hours_back}h back, max {max_messages}"
-    )
-    cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours_back)
-    logger.debug(f"Cutoff time set to: {cutoff_time}")
+    after_id: str | None = None,
+    before_id: str | None = None,
+    after_time: datetime | None = None,
+    before_time: datetime | None = None,
+) -> AsyncIterator[list[DiscordMessage]]:
+    """Yield batches of messages newer than `hours_back` as they are read.
 
-    # Get messages in chronological order (newest first)
-    state, all_messages = await get_channel_messages(
+    `after_id` and `before_id` are exclusive cursors; `after_time` and
+    `before_time` bound the window by creation time. `hours_back` is ignored
+    when any cursor or time bound is given. A window in the past is read by
+    jumping to its end instead of scrolling back from the newest message.
+    A read from an `after_id` cursor with no upper bound is read oldest
+    first, so the messages right after the cursor are the ones returned.
+    """
+    floor_id, top_id = _read_window(
+        hours_back, after_id, before_id, after_time, before_time
+    )
+    after, before = _window_bounds(floor_id, top_id)
+    # Scrolling stops once history past the floor (or top) has been loaded
+    return iter_channel_messages(
         state,
         server_id=server_id,
         channel_id=channel_id,
         limit=max_messages,
+        before=before,
+        after=after,
+        oldest_first=_reads_oldest_first(after_id, top_id),
     )
-    logger.debug(f"Retrieved {len(all_messages)} total messages")
 
-    # Filter to only recent messages within the time window
-    recent_messages = [m for m in all_messages if m.timestamp > cutoff_time]
+
+def _reads_oldest_first(after_id: str | None, top_id: int | None) -> bool:
+    # A polling cursor must not skip messages when more than the limit arrived
+    return bool(after_id) and top_id is None
+
+
+async def read_recent_messages(
+    state: ClientState,
+    server_id: str,
+    channel_id: str,
+    hours_back: int = 24,
+    max_messages: int = 1000,
+    after_id: str | None = None,
+    before_id: str | None = None,
+    after_time: datetime | None = None,
+    before_time: datetime | None = None,
+    on_progress: Callable[[int], Awaitable[None]] | None = None,
+    store: MessageStore | None = None,
+) -> tuple[ClientState, list[DiscordMessage]]:
+    """Read messages newer than `hours_back`, newest first.
+
+    Bounds are as for `iter_recent_messages`. `on_progress` is called with
+    the number of messages read so far after each harvested batch. With a
+    `store`, only the parts of the window it has not fully synced are read
+    from Discord. A read from an `after_id` cursor returns the oldest
+    `max_messages` messages after it.
+    """
     logger.debug(
-        f"Filtered to {len(recent_messages)} messages after cutoff {cutoff_time}"
+        f"read_recent_messages called for server {server_id}, channel {channel_id}, {hours_back}h back, max {max_messages}, after {after_id or after_time}, before {before_id or before_time}"
     )
 
+    if store is not None:
+        floor_id, top_id = _read_window(
+            hours_back, after_id, before_id, after_time, before_time
+        )
+        recent_messages = await _sync_and_load(
+            state,
+            store,
+            server_id,
+            channel_id,
+            floor_id,
+            top_id,
+            max_messages,
+            on_progress,
+            _reads_oldest_first(after_id, top_id),
+        )
+    else:
+        recent_messages = []
+        async for batch in iter_recent_messages(
+            state,
+            server_id,
+            channel_id,
+            hours_back,
+            max_messages,
+            after_id,
+            before_id,
+            after_time,
+            before_time,
+        ):
+            recent_messages.extend(batch)
+            if on_progress:
+                await on_progress(len(recent_messages))
+
+        # Batches arrive newest first, but messages posted while reading may
+        # land in a later batch
+        recent_messages.sort(key=lambda m: int(m.id), reverse=True)
+
     logger.debug(
         f"read_recent_messages completed, returning {len(recent_messages)} messages in chronological order (newest first)"
     )
     return state, recent_messages
+
+
+async def _sync_and_load(
+    state: ClientState,
+    store: MessageStore,
+    server_id: str,
+    channel_id: str,
+    floor_id: int,
+    top_id: int | None,
+    limit: int,
+    on_progress: Callable[[int], Awaitable[None]] | None,
+    oldest_first: bool = False,
+) -> list[DiscordMessage]:
+    """Bring the store up to date for a window, then read it from the store.
+
+    For a window ending now, first fetch only messages newer than the latest
+    synced range (a delta sync). Then, if the synced range reaching the top
+    of the window neither covers it down to the floor nor holds `limit`
+    messages, jump to the bottom of that range and read the gap below it.
+
+    With `oldest_first`, the oldest `limit` messages above the floor are
+    wanted instead: the synced range starting at the floor is extended
+    forward from its top until it holds them.
+    """
+    fetched = 0
+
+    async def fetch(
+        low_id: int, high_id: int | None, fetch_limit: int, forward: bool = False
+    ) -> None:
+        nonlocal fetched
+        coverage = HistoryCoverage()
+        synced_to = high_id or datetime_to_snowflake(datetime.now(timezone.utc))
+        after, before = _window_bounds(low_id, high_id)
+        async for batch in iter_channel_messages(
+            state,
+            server_id=server_id,
+            channel_id=channel_id,
+            limit=fetch_limit,
+            before=before,
+            after=after,
+            coverage=coverage,
+            oldest_first=forward,
+        ):
+            save_messages(store, server_id, batch)
+            fetched += len(batch)
+            if on_progress:
+                await on_progress(min(fetched, limit))
+        if coverage.oldest_id is not None:
+            record_sync_range(
+                store,
+                channel_id,
+                coverage.oldest_id,
+                coverage.newest_id or synced_to,
+            )
+
+    if oldest_first:
+        synced = sync_range_at(store, channel_id, floor_id)
+        synced_high = synced[1] if synced else floor_id
+        have = len(load_messages(store, channel_id, floor_id, synced_high, limit))
+        if have < limit:
+            logger.debug(f"Reading {channel_id} forward from {synced_high}")
+            await fetch(synced_high, None, limit - have, forward=True)
+        # Only the synced part is known to have no gaps above the floor
+        synced = sync_range_at(store, channel_id, floor_id)
+        return load_messages(
+            store,
+            channel_id,
+            floor_id,
+            synced[1] if synced else floor_id,
+            limit,
+            oldest_first=True,
+        )[::-1]
+
+    if top_id is None:
+        top_id = datetime_to_snowflake(datetime.now(timezone.utc))
+        latest = latest_sync_range(store, channel_id)
+        delta_floor = max(floor_id, latest[1]) if latest else floor_id
+        logger.debug(f"Delta sync of channel {channel_id} from {delta_floor}")
+        await fetch(delta_floor, None, limit)
+
+    synced = sync_range_at(store, channel_id, top_id - 1)
+    synced_low = synced[0] if synced else top_id
+    if synced_low > floor_id:
+        have = len(
+            load_messages(store, channel_id, max(synced_low, floor_id), top_id, limit)
+        )
+        if have < limit:
+            logger.debug(f"Reading unsynced history of {channel_id} below {synced_low}")
+            await fetch(floor_id, synced_low, limit - have)
+
+    return load_messages(store, channel_id, floor_id, top_id, limit)
@@ -0,0 +1,71 @@
+import dataclasses as dc
+from urllib.parse import urlsplit
+
+from playwright.async_api import BrowserContext, Page, Route
+
+from .logger import logger
+
+
+def _host_matches(host: str, patterns: frozenset[str]) -> bool:
+    return any(host == p or host.endswith("." + p) for p in patterns)
+
+
+@dc.dataclass(frozen=True)
+class ResourcePolicy:
+    """Which sub-resources scraping pages are allowed to download.
+
+    A request is blocked when its resource type is in `blocked_types` or its
+    host is in `blocked_hosts`, unless its host is in `allowed_hosts`. Hosts
+    match themselves and their subdomains.
+    """
+
+    blocked_types: frozenset[str] = frozenset({"image", "media", "font"})
+    blocked_hosts: frozenset[str] = frozenset()
+    allowed_hosts: frozenset[str] = frozenset()
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        host = urlsplit(url).hostname or ""
+        if _host_matches(host, self.allowed_hosts):
+            return False
+        return resource_type in self.blocked_types or _host_matches(
+            host, self.blocked_hosts
+        )
+
+
+class ResourceBlocker:
+    """Applies a ResourcePolicy to every page of a browser context.
+
+    Individual pages can be exempted, e.g. while they are used to send.
+    """
+
+    def __init__(self, policy: ResourcePolicy) -> None:
+        self.policy = policy
+        self._exempt: set[Page] = set()
+
+    async def install(self, context: BrowserContext) -> None:
+        await context.route("**/*", self._handle)
+
+    def exempt(self, page: Page) -> None:
+        self._exempt.add(page)
+
+    def unexempt(self, page: Page) -> None:
+        self._exempt.discard(page)
+
+    async def _handle(self, route: Route) -> None:
+        request = route.request
+        try:
+            page = request.frame.page
+        except Exception:
+            # Service worker requests have no frame
+            page = None
+
+        try:
+            if page not in self._exempt and self.policy.should_block(
+                request.resource_type, request.url
+            ):
+                await route.abort("blockedbyclient")
+            else:
+                await route.continue_()
+        except Exception as e:
+            # The page may have closed while the request was paused
+            logger.debug(f"Could not route {request.url}: {e}")
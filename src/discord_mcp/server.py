@@ -1,60 +1,330 @@
 import asyncio
+import pathlib as pl
+import time
 import typing as tp
+from datetime import datetime, timedelta, timezone
 from contextlib import asynccontextmanager
 from collections.abc import AsyncIterator, Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from mcp.server.fastmcp import FastMCP
 from mcp.types import ToolAnnotations
 from .logger import logger
 from .client import (
-    create_client_state,
+    DiscordChannel,
+    DiscordGuild,
+    DiscordMessage,
+    build_search_query,
     get_guilds,
     get_guild_channels,
+    get_sidebar_channels,
     send_message as send_discord_message,
     search_messages as search_discord_messages,
+    get_message_context,
     get_search_result_context as get_discord_message_context,
-    close_client,
 )
+from .cache import TTLCache
 from .config import load_config
 from .messages import read_recent_messages
+from .snowflake import datetime_to_snowflake, parse_snowflake
+from .store import (
+    MessageStore,
+    clear_guilds,
+    close_store,
+    is_synced,
+    load_guilds,
+    open_store,
+    save_guilds,
+    save_messages,
+    search_stored_messages,
+    stored_channel_ids,
+)
+from .sharding import (
+    ShardedSession,
+    close_sharded_session,
+    create_sharded_session,
+    run_on_shard,
+    start_sharded_warm_up,
+)
+
+
+_GUILDS_KEY = "guilds"
+# Discord shows this many results per search page
+_SEARCH_PAGE_SIZE = 25
+
+
+@dataclass(frozen=True)
+class _SearchPage:
+    results: list[DiscordMessage]
+    # False when the page may have more results than were read
+    complete: bool
+    # True when answered from the message store, which is cached only after
+    # the searched channels were found to be synced
+    local: bool = False
 
 
 @dataclass
 class DiscordContext:
     config: tp.Any
-    client_lock: asyncio.Lock
+    sessions: ShardedSession
+    guild_cache: TTLCache[str, list[DiscordGuild]]
+    channel_cache: TTLCache[str, list[DiscordChannel]]
+    search_cache: TTLCache[tuple[str, str, int], _SearchPage]
+    store: MessageStore | None = None
+    refreshing: dict[str, asyncio.Task[None]] = field(default_factory=dict)
 
 
 @asynccontextmanager
 async def discord_lifespan(server: FastMCP) -> AsyncIterator[DiscordContext]:
     config = load_config()
-    client_lock = asyncio.Lock()
+    store = (
+        open_store(pl.Path(config.store_path).expanduser())
+        if config.store_path
+        else None
+    )
+    guild_cache: TTLCache[str, list[DiscordGuild]] = TTLCache(
+        ttl_s=config.guild_cache_ttl_s
+    )
+    if store is not None and (stored := load_guilds(store)):
+        guild_cache.put(_GUILDS_KEY, stored[0], fetched_at=stored[1])
+    sessions = create_sharded_session(config)
+    discord_ctx = DiscordContext(
+        config=config,
+        sessions=sessions,
+        guild_cache=guild_cache,
+        channel_cache=TTLCache(ttl_s=config.channel_cache_ttl_s),
+        search_cache=TTLCache(ttl_s=config.search_cache_ttl_s),
+        store=store,
+    )
     logger.debug("Discord MCP server starting up")
+    start_sharded_warm_up(sessions)
     try:
-        yield DiscordContext(config=config, client_lock=client_lock)
+        yield discord_ctx
     finally:
         logger.debug("Discord MCP server shutting down")
+        tasks = list(discord_ctx.refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await close_sharded_session(sessions)
+        if store is not None:
+            close_store(store)
 
 
-async def _execute_with_fresh_client[T](
+async def _execute_with_session[T](
     discord_ctx: DiscordContext,
     operation: Callable[[tp.Any], tp.Awaitable[tuple[tp.Any, T]]],
+    server_id: str | None = None,
+    read_only: bool = True,
 ) -> T:
-    """Execute Discord operation with fresh client state"""
-    async with discord_ctx.client_lock:
-        client_state = create_client_state(
-            discord_ctx.config.email,
-            discord_ctx.config.password,
-            True,
-            discord_ctx.config.extra_wait_ms,
-        )
+    """Execute Discord operation on the browser shard that owns the server"""
+    return await run_on_shard(discord_ctx.sessions, server_id, operation, read_only)
+
+
+def _note_server(discord_ctx: DiscordContext, server_id: str) -> None:
+    """Drop the cached server list when a call names a server it doesn't have"""
+    entry = discord_ctx.guild_cache.get_entry(_GUILDS_KEY)
+    if entry and all(g.id != server_id for g in entry.value):
+        logger.debug(f"Server {server_id} is not in the cached list, invalidating it")
+        discord_ctx.guild_cache.invalidate(_GUILDS_KEY)
+        if discord_ctx.store is not None:
+            clear_guilds(discord_ctx.store)
+
+
+async def _fetch_channels(
+    discord_ctx: DiscordContext, server_id: str
+) -> list[DiscordChannel]:
+    async def operation(state):
+        return await get_guild_channels(state, server_id)
+
+    channels = await _execute_with_session(discord_ctx, operation, server_id)
+    discord_ctx.channel_cache.put(server_id, channels)
+    return channels
+
+
+async def _revalidate_channels(
+    discord_ctx: DiscordContext, server_id: str, cached: list[DiscordChannel]
+) -> None:
+    """Refresh a stale channel list in the background.
+
+    Only the sidebar is read; the full list with Browse Channels is re-read
+    only when the sidebar shows a channel the cached list doesn't have.
+    """
+    try:
+
+        async def operation(state):
+            return await get_sidebar_channels(state, server_id)
+
+        sidebar = await _execute_with_session(discord_ctx, operation, server_id)
+        known = {c.id for c in cached}
+        if any(c.id not in known for c in sidebar):
+            logger.debug(f"New channels in server {server_id}, re-reading the list")
+            await _fetch_channels(discord_ctx, server_id)
+        else:
+            discord_ctx.channel_cache.put(server_id, cached)
+    except Exception as e:
+        logger.error(f"Refreshing channels of server {server_id} failed: {e}")
+    finally:
+        discord_ctx.refreshing.pop(server_id, None)
+
+
+async def _search(
+    discord_ctx: DiscordContext,
+    server_id: str,
+    full_query: str,
+    page: int,
+    min_results: int,
+    operation: Callable[
+        [int], Callable[[tp.Any], tp.Awaitable[tuple[tp.Any, list[DiscordMessage]]]]
+    ]
+    | None,
+    local: Callable[[int], tp.Awaitable[list[DiscordMessage]]] | None = None,
+) -> list[DiscordMessage]:
+    """Results of one search page, from the cache when it has enough of them.
+
+    Pages are cached by server, page and query text with case and spacing
+    normalized, so a search and a later context lookup share one search.
+    `operation` builds the client call for a result limit. `local`, when
+    given, answers the search from the message store first; Discord is
+    searched when it fails. Without `operation`, `local` need not check that
+    the store is synced, so its pages are not cached.
+    """
+    key = (server_id, " ".join(full_query.casefold().split()), page)
+    cached = discord_ctx.search_cache.get(key)
+    if (
+        cached
+        and (local if cached.local else operation) is not None
+        and (cached.complete or len(cached.results) >= min_results)
+    ):
+        logger.debug(f"Search results for {full_query!r} page {page} from cache")
+        return cached.results
+
+    # Read a whole page so later calls with other limits hit the cache
+    limit = max(min_results, _SEARCH_PAGE_SIZE)
+    if local is not None:
         try:
-            _, result = await operation(client_state)
-            return result
-        finally:
-            logger.debug("Cleaning up browser resources")
-            await close_client(client_state)
+            results = await local(limit)
+        except Exception as e:
+            if operation is None:
+                raise
+            logger.debug(f"Searching on Discord instead of locally: {e}")
+        else:
+            if operation is None:
+                return results
+            discord_ctx.search_cache.prune()
+            discord_ctx.search_cache.put(
+                key, _SearchPage(results, len(results) < limit, local=True)
+            )
+            return results
+    if operation is None:
+        raise ValueError("Searching on Discord is disabled")
+
+    results = await _execute_with_session(discord_ctx, operation(limit), server_id)
+    if discord_ctx.store is not None:
+        # Index the hits; results scraped from the page have no channel ID
+        save_messages(
+            discord_ctx.store,
+            server_id,
+            [m for m in results if parse_snowflake(m.channel_id)],
+        )
+    discord_ctx.search_cache.prune()
+    discord_ctx.search_cache.put(key, _SearchPage(results, len(results) < limit))
+    return results
+
+
+def _parse_day(name: str, value: str) -> datetime:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise ValueError(f"{name} must be a date in YYYY-MM-DD format")
+
+
+async def _search_locally(
+    discord_ctx: DiscordContext,
+    server_id: str,
+    query: str,
+    in_channels: list[str],
+    from_users: list[str],
+    content_types: list[str],
+    before: str,
+    after: str,
+    page: int,
+    max_results: int,
+    require_synced: bool,
+) -> list[DiscordMessage]:
+    """Answer a search from the message store.
+
+    Raises ValueError when the search can't be answered locally, and with
+    `require_synced` also when a searched channel isn't fully synced over
+    the searched dates. Without `in_channels`, the searched channels are
+    those with stored messages. `require_synced` never opens Discord:
+    channel names are then resolved from the cached channel list only.
+    Dates follow Discord: `after` excludes its day.
+    """
+    store = discord_ctx.store
+    if store is None or not store.full_text:
+        raise ValueError("Local search needs the message store with SQLite FTS5")
+
+    channel_ids = None
+    if in_channels:
+        entry = discord_ctx.channel_cache.get_entry(server_id)
+        if entry:
+            channels = entry.value
+        elif require_synced:
+            raise ValueError("The channel list of this server is not cached")
+        else:
+            channels = await _fetch_channels(discord_ctx, server_id)
+        by_name = {c.name.casefold(): c.id for c in channels}
+        names = [name.lstrip("#").casefold() for name in in_channels]
+        if unknown := [n for n in names if n not in by_name]:
+            raise ValueError(f"Unknown channels: {', '.join(unknown)}")
+        channel_ids = [by_name[n] for n in names]
+
+    low_id = (
+        datetime_to_snowflake(_parse_day("after", after) + timedelta(days=1))
+        if after
+        else 0
+    )
+    high_id = datetime_to_snowflake(_parse_day("before", before)) if before else None
+    if require_synced:
+        # Accept results as stale as a cached Discord search could be
+        synced_to = high_id or datetime_to_snowflake(
+            datetime.now(timezone.utc)
+            - timedelta(seconds=discord_ctx.config.search_cache_ttl_s)
+        )
+        searched = channel_ids or stored_channel_ids(store, server_id)
+        if not searched:
+            raise ValueError("No messages of this server are stored")
+        unsynced = [c for c in searched if not is_synced(store, c, low_id, synced_to)]
+        if unsynced:
+            raise ValueError(f"{len(unsynced)} channels are not fully synced")
+
+    return search_stored_messages(
+        store,
+        server_id,
+        query,
+        channel_ids,
+        from_users,
+        content_types,
+        low_id,
+        high_id,
+        max_results,
+        # Pages start every 25 results like on Discord, whatever the limit
+        (page - 1) * _SEARCH_PAGE_SIZE,
+    )
+
+
+def _parse_time(name: str, value: str) -> datetime | None:
+    """Parse an ISO 8601 tool argument, treating times without offset as UTC"""
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 date or time")
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
 
 
 mcp = FastMCP("discord-mcp", lifespan=discord_lifespan)
@@ -64,16 +334,27 @@ mcp = FastMCP("discord-mcp", lifespan=discord_lifespan)
     description="List all Discord servers you have access to",
     annotations=ToolAnnotations(readOnlyHint=True),
 )
-async def get_servers() -> list[dict[str, str]]:
+async def get_servers(refresh: bool = False) -> list[dict[str, str]]:
     """List all Discord servers you have access to.
 
+    The list is cached; it is re-read from Discord when the cache expires,
+    when a call names a server it doesn't contain, or with `refresh`.
+
+    Args:
+        refresh: Re-read the server list from Discord instead of the cache
+
     Returns:
         List of server objects with id and name fields
     """
     ctx = mcp.get_context()
     discord_ctx = tp.cast(DiscordContext, ctx.request_context.lifespan_context)
 
-    guilds = await _execute_with_fresh_client(discord_ctx, get_guilds)
+    guilds = None if refresh else discord_ctx.guild_cache.get(_GUILDS_KEY)
+    if guilds is None:
+        guilds = await _execute_with_session(discord_ctx, get_guilds)
+        discord_ctx.guild_cache.put(_GUILDS_KEY, guilds)
+        if discord_ctx.store is not None:
+            save_guilds(discord_ctx.store, guilds, time.time())
     return [{"id": g.id, "name": g.name} for g in guilds]
 
 
@@ -84,6 +365,9 @@ async def get_servers() -> list[dict[str, str]]:
 async def get_channels(server_id: str) -> list[dict[str, str]]:
     """List all channels in a specific Discord server.
 
+    The list is cached. Once it expires, the cached list is still returned
+    while it is refreshed in the background.
+
     Args:
         server_id: Discord server ID
 
@@ -92,11 +376,20 @@ async def get_channels(server_id: str) -> list[dict[str, str]]:
     """
     ctx = mcp.get_context()
     discord_ctx = tp.cast(DiscordContext, ctx.request_context.lifespan_context)
+    _note_server(discord_ctx, server_id)
 
-    async def operation(state):
-        return await get_guild_channels(state, server_id)
-
-    channels = await _execute_with_fresh_client(discord_ctx, operation)
+    entry = discord_ctx.channel_cache.get_entry(server_id)
+    if entry is None:
+        channels = await _fetch_channels(discord_ctx, server_id)
+    else:
+        channels = entry.value
+        if (
+            not discord_ctx.channel_cache.is_fresh(entry)
+            and server_id not in discord_ctx.refreshing
+        ):
+            discord_ctx.refreshing[server_id] = asyncio.create_task(
+                _revalidate_channels(discord_ctx, server_id, channels)
+            )
     return [{"id": c.id, "name": c.name, "type": str(c.type)} for c in channels]
 
 
@@ -105,43 +398,105 @@ async def get_channels(server_id: str) -> list[dict[str, str]]:
     annotations=ToolAnnotations(readOnlyHint=True),
 )
 async def read_messages(
-    server_id: str, channel_id: str, max_messages: int, hours_back: int = 24
-) -> list[dict[str, tp.Any]]:
+    server_id: str,
+    channel_id: str,
+    max_messages: int,
+    hours_back: int = 24,
+    after_id: str = "",
+    before_id: str = "",
+    after_time: str = "",
+    before_time: str = "",
+    include_metadata: bool = False,
+) -> dict[str, tp.Any]:
     """Read recent messages from a specific channel.
 
+    To poll for new messages, pass the `next_after_id` of the previous call
+    as `after_id`; the oldest `max_messages` messages after it are returned,
+    and `has_more` says whether to call again right away. To page back
+    through older history, pass `next_before_id` as `before_id`. To read a
+    window in the past, pass `after_time` and `before_time`; the channel is
+    opened at the end of the window instead of scrolling back to it.
+
     Args:
         server_id: Discord server ID
         channel_id: Channel ID to read from
-        max_messages: Maximum number of messages to retrieve (1-1000)
-        hours_back: How many hours back to search (default 24, max 8760)
+        max_messages: Maximum number of messages to retrieve (1-5000)
+        hours_back: How many hours back to search (default 24, max 8760; ignored with any cursor or time bound)
+        after_id: Only return messages newer than this message ID
+        before_id: Only return messages older than this message ID
+        after_time: Only return messages sent at or after this ISO 8601 time (UTC if no offset)
+        before_time: Only return messages sent before this ISO 8601 time (UTC if no offset)
+        include_metadata: Also return author_id, reply_to_id, edited_timestamp, reactions, embeds and stickers
 
     Returns:
-        List of message objects with id, content, author_name, timestamp, and attachments
+        Object with messages (id, content, author_name, timestamp, attachments; newest first),
+        next_after_id and next_before_id cursors,
+        and has_more (true when max_messages were returned)
     """
     if not (1 <= hours_back <= 8760):
         raise ValueError("hours_back must be between 1 and 8760 (1 year)")
-    if not (1 <= max_messages <= 1000):
-        raise ValueError("max_messages must be between 1 and 1000")
+    if not (1 <= max_messages <= 5000):
+        raise ValueError("max_messages must be between 1 and 5000")
+    for name, value in (("after_id", after_id), ("before_id", before_id)):
+        if value and parse_snowflake(value) is None:
+            raise ValueError(f"{name} must be a Discord message ID")
+    after_dt = _parse_time("after_time", after_time)
+    before_dt = _parse_time("before_time", before_time)
+    if after_dt and before_dt and after_dt >= before_dt:
+        raise ValueError("after_time must be earlier than before_time")
 
     ctx = mcp.get_context()
     discord_ctx = tp.cast(DiscordContext, ctx.request_context.lifespan_context)
+    _note_server(discord_ctx, server_id)
+
+    async def report_progress(read: int) -> None:
+        await ctx.report_progress(read, max_messages)
 
     async def operation(state):
         return await read_recent_messages(
-            state, server_id, channel_id, hours_back, max_messages
+            state,
+            server_id,
+            channel_id,
+            hours_back,
+            max_messages,
+            after_id=after_id or None,
+            before_id=before_id or None,
+            after_time=after_dt,
+            before_time=before_dt,
+            on_progress=report_progress,
+            store=discord_ctx.store,
         )
 
-    messages = await _execute_with_fresh_client(discord_ctx, operation)
-    return [
-        {
+    messages = await _execute_with_session(discord_ctx, operation, server_id)
+
+    def msg_to_dict(m):
+        data = {
             "id": m.id,
             "content": m.content,
             "author_name": m.author_name,
-            "timestamp": m.timestamp.isoformat(),
+            "timestamp": m.timestamp.isoformat() if m.timestamp else None,
             "attachments": m.attachments,
         }
-        for m in messages
-    ]
+        if include_metadata:
+            data |= {
+                "author_id": m.author_id,
+                "reply_to_id": m.reply_to_id,
+                "edited_timestamp": m.edited_timestamp.isoformat()
+                if m.edited_timestamp
+                else None,
+                "reactions": m.reactions,
+                "embeds": m.embeds,
+                "stickers": m.stickers,
+            }
+        return data
+
+    return {
+        "messages": [msg_to_dict(m) for m in messages],
+        # Newest seen ID, kept when nothing new arrived so polling can resume
+        "next_after_id": messages[0].id if messages else after_id or None,
+        "next_before_id": messages[-1].id if messages else None,
+        "has_more": len(messages) >= max_messages,
+    }
 
 
 @mcp.tool(
@@ -217,6 +572,7 @@ async def send_message(
 
     ctx = mcp.get_context()
     discord_ctx = tp.cast(DiscordContext, ctx.request_context.lifespan_context)
+    _note_server(discord_ctx, server_id)
 
     message_ids = []
     for i, chunk in enumerate(chunks):
@@ -226,7 +582,9 @@ async def send_message(
                 state, server_id, channel_id, chunk_content
             )
 
-        message_id = await _execute_with_fresh_client(discord_ctx, operation)
+        message_id = await _execute_with_session(
+            discord_ctx, operation, server_id, read_only=False
+        )
         message_ids.append(message_id)
 
         # Small delay between messages to avoid rate limiting
@@ -258,9 +616,17 @@ async def search_messages(
     pinned: bool = False,
     page: int = 1,
     max_results: int = 25,
+    mode: str = "auto",
 ) -> list[dict[str, tp.Any]]:
     """Search for messages in a Discord server with filters for channels, users, dates, and content types.
 
+    Searches can be answered from the local message store, which indexes
+    every message read: in milliseconds, best match first, with any number
+    of results. The "auto" mode does so when every searched channel has
+    been fully read over the searched dates (without in_channels, every
+    channel with stored messages), and searches on Discord otherwise.
+    mentions_users, author_type and pinned need Discord.
+
     Args:
         server_id: Discord server/guild ID
         query: Search text content to find
@@ -272,8 +638,9 @@ async def search_messages(
         after: Date filter YYYY-MM-DD (messages after this date)
         author_type: Filter by author type (user, bot, webhook)
         pinned: Only search pinned messages (default False)
-        page: Page number of results (1-indexed, default 1)
-        max_results: Maximum number of results per page (1-100, default 25)
+        page: Page number of results (1-indexed, default 1; pages start every 25 results)
+        max_results: Maximum number of results per page (1-100 on Discord, up to 5000 locally, default 25)
+        mode: "auto" (default), "local" to search only the local store, or "discord"
     """
     if not query.strip() and not any(
         [
@@ -288,8 +655,12 @@ async def search_messages(
         ]
     ):
         raise ValueError("Must provide query text or at least one filter")
-    if not (1 <= max_results <= 100):
-        raise ValueError("max_results must be between 1 and 100")
+    if mode not in ("auto", "local", "discord"):
+        raise ValueError("mode must be one of: auto, local, discord")
+    if not (1 <= max_results <= 5000):
+        raise ValueError("max_results must be between 1 and 5000")
+    if mode == "discord" and max_results > 100:
+        raise ValueError("max_results must be between 1 and 100 on Discord")
     if page < 1:
         raise ValueError("page must be at least 1")
 
@@ -301,35 +672,77 @@ async def search_messages(
 
     ctx = mcp.get_context()
     discord_ctx = tp.cast(DiscordContext, ctx.request_context.lifespan_context)
+    _note_server(discord_ctx, server_id)
 
-    async def operation(state):
-        return await search_discord_messages(
-            state,
-            server_id=server_id,
-            query=query,
-            in_channels=in_channels,
-            from_users=from_users,
-            mentions_users=mentions_users,
-            has_filters=content_types,
-            before=before,
-            after=after,
-            author_type=author_type,
-            pinned=pinned,
-            page=page,
-            limit=max_results,
-        )
-
-    messages = await _execute_with_fresh_client(discord_ctx, operation)
-    return [
-        {
+    def to_dict(m: DiscordMessage) -> dict[str, tp.Any]:
+        return {
             "id": m.id,
             "content": m.content,
             "author_name": m.author_name,
-            "timestamp": m.timestamp.isoformat(),
+            "timestamp": m.timestamp.isoformat() if m.timestamp else None,
             "attachments": m.attachments,
         }
-        for m in messages
-    ]
+
+    async def search_locally(limit: int) -> list[DiscordMessage]:
+        if mentions_users or author_type or pinned:
+            raise ValueError(
+                "mentions_users, author_type and pinned can only be searched on Discord"
+            )
+        return await _search_locally(
+            discord_ctx,
+            server_id,
+            query,
+            in_channels,
+            from_users,
+            content_types,
+            before,
+            after,
+            page,
+            limit,
+            require_synced=mode == "auto",
+        )
+
+    def operation(limit: int):
+        async def search(state):
+            return await search_discord_messages(
+                state,
+                server_id=server_id,
+                query=query,
+                in_channels=in_channels,
+                from_users=from_users,
+                mentions_users=mentions_users,
+                has_filters=content_types,
+                before=before,
+                after=after,
+                author_type=author_type,
+                pinned=pinned,
+                page=page,
+                limit=limit,
+            )
+
+        return search
+
+    full_query = build_search_query(
+        query,
+        in_channels,
+        from_users,
+        mentions_users,
+        content_types,
+        before,
+        after,
+        author_type,
+        pinned,
+    )
+    messages = await _search(
+        discord_ctx,
+        server_id,
+        full_query,
+        page,
+        max_results,
+        None if mode == "local" else operation,
+        None if mode == "discord" else search_locally,
+    )
+    return [to_dict(m) for m in messages[:max_results]]
 
 
 @mcp.tool(
@@ -348,8 +761,11 @@ async def get_search_result_context(
 ) -> dict[str, tp.Any]:
     """Jump to a search result and get surrounding message context for conversation analysis.
 
-    Searches for messages, clicks "Jump" on the specified result, and extracts
+    Searches for messages, jumps to the specified result, and extracts
     messages before and after the target message for conversation context.
+    Results of an earlier identical search_messages call are reused, so the
+    search is not run again. Like search_messages, the search is answered
+    from the local message store when the searched channels are synced.
 
     Args:
         server_id: Discord server/guild ID
@@ -372,8 +788,63 @@ async def get_search_result_context(
 
     ctx = mcp.get_context()
     discord_ctx = tp.cast(DiscordContext, ctx.request_context.lifespan_context)
+    _note_server(discord_ctx, server_id)
+
+    def search_operation(limit: int):
+        async def search(state):
+            return await search_discord_messages(
+                state,
+                server_id=server_id,
+                query=query,
+                in_channels=in_channels,
+                from_users=from_users,
+                page=page,
+                limit=limit,
+            )
+
+        return search
+
+    async def search_locally(limit: int) -> list[DiscordMessage]:
+        return await _search_locally(
+            discord_ctx,
+            server_id,
+            query,
+            in_channels,
+            from_users,
+            [],
+            "",
+            "",
+            page,
+            limit,
+            require_synced=True,
+        )
+
+    full_query = build_search_query(query, in_channels, from_users)
+    results = await _search(
+        discord_ctx,
+        server_id,
+        full_query,
+        page,
+        result_index + 1,
+        search_operation,
+        search_locally,
+    )
+    if result_index >= len(results):
+        return {"error": "Could not get message context", "found": False}
+    target = results[result_index]
 
     async def operation(state):
+        if parse_snowflake(target.channel_id) and parse_snowflake(target.id):
+            # Open the result's message link instead of searching again
+            return await get_message_context(
+                state,
+                server_id,
+                target.channel_id,
+                target.id,
+                before_count,
+                after_count,
+                in_channels[0] if in_channels else "",
+            )
         return await get_discord_message_context(
             state,
             server_id=server_id,
@@ -386,7 +857,7 @@ async def get_search_result_context(
             page=page,
         )
 
-    context = await _execute_with_fresh_client(discord_ctx, operation)
+    context = await _execute_with_session(discord_ctx, operation, server_id)
 
     if context is None:
         return {"error": "Could not get message context", "found": False}
@@ -396,7 +867,7 @@ async def get_search_result_context(
             "id": m.id,
             "content": m.content,
             "author_name": m.author_name,
-            "timestamp": m.timestamp.isoformat(),
+            "timestamp": m.timestamp.isoformat() if m.timestamp else None,
         }
 
     return {
@@ -0,0 +1,370 @@
+import asyncio
+import dataclasses as dc
+import pathlib as pl
+import time
+import typing as tp
+from collections.abc import Callable, Coroutine
+
+from playwright.async_api import BrowserContext, CDPSession, Page
+
+from .client import (
+    ClientState,
+    close_client,
+    create_client_state,
+    is_client_connected,
+    is_logged_out,
+    is_page_healthy,
+    open_page,
+    start_client,
+)
+from .config import DiscordConfig
+from .logger import logger
+from .routing import ResourcePolicy
+
+
+@dc.dataclass
+class _PageStats:
+    opened_at: float = dc.field(default_factory=time.monotonic)
+    operations: int = 0
+    cdp: CDPSession | None = None
+
+
+@dc.dataclass
+class BrowserSession:
+    """Long-lived browser session shared by all tool calls.
+
+    One browser context holds a pool of logged-in pages. Each tool call checks
+    a page out, runs on it and checks it back in, so independent calls run in
+    parallel. The browser is relaunched only when it has crashed; an expired
+    login is handled by the client's login cache on the next call.
+
+    The browser is launched and logged in by a background task started with
+    the server; `ready` is set once that first attempt has finished.
+
+    Pages and the browser itself are recycled after a number of operations, an
+    age, or (for pages) a JS heap size, to bound memory growth. Recycling runs
+    in background tasks after check-in, never on a caller's path.
+    """
+
+    config: DiscordConfig
+    launch_lock: asyncio.Lock = dc.field(default_factory=asyncio.Lock)
+    base: ClientState | None = None
+    idle_pages: asyncio.Queue[Page] = dc.field(default_factory=asyncio.Queue)
+    ready: asyncio.Event = dc.field(default_factory=asyncio.Event)
+    warm_up_task: asyncio.Task[None] | None = None
+    launched_at: float = 0.0
+    operations: int = 0
+    page_stats: dict[Page, _PageStats] = dc.field(default_factory=dict)
+    checked_out: dict[BrowserContext, int] = dc.field(default_factory=dict)
+    retired: dict[BrowserContext, ClientState] = dc.field(default_factory=dict)
+    recycling_browser: bool = False
+    background_tasks: set[asyncio.Task[None]] = dc.field(default_factory=set)
+
+
+def create_session(config: DiscordConfig) -> BrowserSession:
+    return BrowserSession(config=config)
+
+
+def _is_usable(base: ClientState | None) -> bool:
+    return bool(base and is_client_connected(base))
+
+
+def _is_current(session: BrowserSession, page: Page) -> bool:
+    return session.base is not None and page.context is session.base.context
+
+
+def _spawn(session: BrowserSession, coro: Coroutine[tp.Any, tp.Any, None]) -> None:
+    task = asyncio.create_task(coro)
+    session.background_tasks.add(task)
+    task.add_done_callback(session.background_tasks.discard)
+
+
+def _resource_policy(config: DiscordConfig) -> ResourcePolicy | None:
+    if not config.block_resources:
+        return None
+    if config.profile_dir:
+        # Playwright disables the HTTP cache while routing requests, which
+        # would defeat the persistent profile's on-disk cache
+        logger.debug("Resource blocking is off with a persistent profile")
+        return None
+    return ResourcePolicy(
+        blocked_types=frozenset(config.blocked_resource_types),
+        blocked_hosts=frozenset(config.blocked_hosts),
+        allowed_hosts=frozenset(config.allowed_hosts),
+    )
+
+
+async def _start_browser(session: BrowserSession) -> tuple[ClientState, list[Page]]:
+    state = create_client_state(
+        session.config.email,
+        session.config.password,
+        True,
+        session.config.extra_wait_ms,
+        session.config.login_cache_ttl_s,
+        _resource_policy(session.config),
+        pl.Path(session.config.profile_dir).expanduser()
+        if session.config.profile_dir
+        else None,
+    )
+    try:
+        state = await start_client(state)
+        pages = [state.page] if state.page else []
+        for _ in range(session.config.pool_size - len(pages)):
+            pages.append(await open_page(state))
+    except Exception:
+        await close_client(state)
+        raise
+    return state, pages
+
+
+def _install_browser(
+    session: BrowserSession, state: ClientState, pages: list[Page]
+) -> None:
+    # Reuse the queue so callers already waiting on it receive the new pages
+    while not session.idle_pages.empty():
+        session.page_stats.pop(session.idle_pages.get_nowait(), None)
+    session.base = state
+    session.launched_at = time.monotonic()
+    session.operations = 0
+    for page in pages:
+        session.page_stats[page] = _PageStats()
+        session.idle_pages.put_nowait(page)
+    logger.debug(f"Browser session ready with {len(pages)} pooled pages")
+
+
+async def _ensure_client(session: BrowserSession) -> ClientState:
+    if session.base is not None and _is_usable(session.base):
+        return session.base
+
+    async with session.launch_lock:
+        if session.base is not None and _is_usable(session.base):
+            return session.base
+        if session.base is not None:
+            logger.debug("Browser session is no longer usable, relaunching")
+            if session.base.context is not None:
+                session.checked_out.pop(session.base.context, None)
+            await close_client(session.base)
+            session.base = None
+        state, pages = await _start_browser(session)
+        _install_browser(session, state, pages)
+        return state
+
+
+async def _warm_up(session: BrowserSession, after: BrowserSession | None) -> None:
+    try:
+        if after is not None:
+            # Let the first browser log in and save cookies before reusing them
+            await after.ready.wait()
+        await _ensure_client(session)
+    except Exception as e:
+        # Tool calls retry the launch themselves and surface the error
+        logger.error(f"Background browser warm-up failed: {e}")
+    finally:
+        session.ready.set()
+
+
+def start_warm_up(session: BrowserSession, after: BrowserSession | None = None) -> None:
+    """Launch and log in the browser in the background so the first call is warm.
+
+    With `after`, wait for that session's warm-up to finish first.
+    """
+    if session.warm_up_task is None:
+        session.warm_up_task = asyncio.create_task(_warm_up(session, after))
+
+
+async def _replace_page(session: BrowserSession, base: ClientState, page: Page) -> Page:
+    # Open the new page first: a persistent context with no pages left looks
+    # crashed to is_client_connected
+    new_page = await open_page(base)
+    session.page_stats[new_page] = _PageStats()
+    session.page_stats.pop(page, None)
+    try:
+        await page.close()
+    except Exception:
+        pass
+    return new_page
+
+
+async def _check_out(session: BrowserSession) -> tuple[ClientState, Page]:
+    if session.warm_up_task is not None:
+        await session.ready.wait()
+    deadline = time.monotonic() + session.config.pool_max_wait_s
+    while True:
+        await _ensure_client(session)
+        try:
+            page = await asyncio.wait_for(
+                session.idle_pages.get(), max(deadline - time.monotonic(), 0)
+            )
+        except TimeoutError:
+            raise RuntimeError(
+                f"No browser page became available within {session.config.pool_max_wait_s}s"
+            )
+        base = session.base
+        if base is not None and page.context is base.context:
+            break
+        # Left over from a browser that was recycled while the page was queued
+
+    if session.config.pool_health_check and not await is_page_healthy(page):
+        logger.debug("Pooled page failed health check, replacing it")
+        try:
+            page = await _replace_page(session, base, page)
+        except Exception:
+            # Keep the pool size stable so later calls can still check out
+            session.idle_pages.put_nowait(page)
+            raise
+
+    session.checked_out[page.context] = session.checked_out.get(page.context, 0) + 1
+    return base, page
+
+
+def _check_in(session: BrowserSession, state: ClientState, page: Page) -> None:
+    context = page.context
+    session.checked_out[context] = session.checked_out.get(context, 1) - 1
+    if not _is_current(session, page):
+        # Page belongs to a browser that has since been recycled or relaunched
+        session.page_stats.pop(page, None)
+        _close_retired_if_idle(session, context)
+        return
+
+    if is_logged_out(state):
+        state.login_cache.invalidate("page was left on the login screen")
+    session.page_stats.setdefault(page, _PageStats()).operations += 1
+    session.operations += 1
+    _spawn(session, _return_page(session, page))
+    if reason := _browser_recycle_reason(session):
+        session.recycling_browser = True
+        _spawn(session, _recycle_browser(session, reason))
+
+
+async def _js_heap_mb(page: Page, stats: _PageStats) -> float | None:
+    try:
+        if stats.cdp is None:
+            stats.cdp = await page.context.new_cdp_session(page)
+            await stats.cdp.send("Performance.enable")
+        metrics = await stats.cdp.send("Performance.getMetrics")
+    except Exception as e:
+        logger.debug(f"Could not read page metrics: {e}")
+        return None
+    for metric in metrics.get("metrics", []):
+        if metric["name"] == "JSHeapUsedSize":
+            return metric["value"] / (1024 * 1024)
+    return None
+
+
+async def _page_recycle_reason(session: BrowserSession, page: Page) -> str | None:
+    config = session.config
+    stats = session.page_stats.setdefault(page, _PageStats())
+    if (
+        config.recycle_page_after_ops
+        and stats.operations >= config.recycle_page_after_ops
+    ):
+        return f"{stats.operations} operations"
+    age_s = time.monotonic() - stats.opened_at
+    if config.recycle_page_after_s and age_s >= config.recycle_page_after_s:
+        return f"open for {age_s:.0f}s"
+    if config.recycle_page_max_heap_mb:
+        heap_mb = await _js_heap_mb(page, stats)
+        if heap_mb is not None and heap_mb >= config.recycle_page_max_heap_mb:
+            return f"JS heap at {heap_mb:.0f}MB"
+    return None
+
+
+async def _return_page(session: BrowserSession, page: Page) -> None:
+    reason = await _page_recycle_reason(session, page)
+    base = session.base
+    if base is None or not _is_current(session, page):
+        return
+    if reason is None:
+        session.idle_pages.put_nowait(page)
+        return
+
+    logger.debug(f"Recycling page after {reason}")
+    try:
+        page = await _replace_page(session, base, page)
+    except Exception as e:
+        # Keep the old page rather than shrink the pool; it is retried next time
+        logger.error(f"Could not open a replacement page: {e}")
+    if _is_current(session, page):
+        session.idle_pages.put_nowait(page)
+
+
+def _browser_recycle_reason(session: BrowserSession) -> str | None:
+    config = session.config
+    # Two browsers cannot share one persistent profile directory
+    if session.recycling_browser or config.profile_dir or session.base is None:
+        return None
+    if (
+        config.recycle_browser_after_ops
+        and session.operations >= config.recycle_browser_after_ops
+    ):
+        return f"{session.operations} operations"
+    age_s = time.monotonic() - session.launched_at
+    if config.recycle_browser_after_s and age_s >= config.recycle_browser_after_s:
+        return f"running for {age_s:.0f}s"
+    return None
+
+
+async def _recycle_browser(session: BrowserSession, reason: str) -> None:
+    try:
+        logger.debug(f"Recycling browser after {reason}")
+        state, pages = await _start_browser(session)
+        async with session.launch_lock:
+            old = session.base
+            _install_browser(session, state, pages)
+        if old is not None and old.context is not None:
+            session.retired[old.context] = old
+            _close_retired_if_idle(session, old.context)
+    except Exception as e:
+        logger.error(f"Browser recycling failed, keeping the current browser: {e}")
+    finally:
+        session.recycling_browser = False
+
+
+def _close_retired_if_idle(session: BrowserSession, context: BrowserContext) -> None:
+    if context in session.retired and session.checked_out.get(context, 0) <= 0:
+        session.checked_out.pop(context, None)
+        _spawn(session, close_client(session.retired.pop(context)))
+
+
+async def run_with_session[T](
+    session: BrowserSession,
+    operation: Callable[[ClientState], tp.Awaitable[tuple[ClientState, T]]],
+    read_only: bool = True,
+) -> T:
+    """Check a pooled page out for one operation and return it afterwards.
+
+    Pass `read_only=False` for operations that post to Discord so they can be
+    exempted from resource blocking.
+    """
+    base, page = await _check_out(session)
+    blocker = base.resource_blocker
+    exempt = bool(
+        blocker and not read_only and session.config.unblock_resources_on_send
+    )
+    if blocker and exempt:
+        blocker.exempt(page)
+    state = dc.replace(base, page=page)
+    try:
+        state, result = await operation(state)
+        return result
+    finally:
+        if blocker and exempt:
+            blocker.unexempt(page)
+        _check_in(session, state, page)
+
+
+async def close_session(session: BrowserSession) -> None:
+    tasks = list(session.background_tasks)
+    if session.warm_up_task is not None:
+        tasks.append(session.warm_up_task)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    async with session.launch_lock:
+        for state in session.retired.values():
+            await close_client(state)
+        session.retired.clear()
+        if session.base is not None:
+            await close_client(session.base)
+            session.base = None
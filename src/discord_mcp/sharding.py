@@ -0,0 +1,78 @@
+import asyncio
+import dataclasses as dc
+import hashlib
+import pathlib as pl
+import typing as tp
+from collections.abc import Callable
+
+from .client import ClientState
+from .config import DiscordConfig
+from .session import (
+    BrowserSession,
+    close_session,
+    create_session,
+    run_with_session,
+    start_warm_up,
+)
+
+
+@dc.dataclass
+class ShardedSession:
+    """Several independent browser sessions, each in its own browser process.
+
+    Guild IDs are mapped to shards with rendezvous hashing, so a guild always
+    uses the same browser and only about 1/N of guilds move when the shard
+    count changes. Calls that are not tied to a guild use the first shard.
+    """
+
+    shards: list[BrowserSession]
+
+
+def shard_index(guild_id: str, shard_count: int) -> int:
+    def weight(index: int) -> int:
+        digest = hashlib.blake2b(f"{index}:{guild_id}".encode(), digest_size=8)
+        return int.from_bytes(digest.digest())
+
+    return max(range(shard_count), key=weight)
+
+
+def create_sharded_session(config: DiscordConfig) -> ShardedSession:
+    if config.shard_count <= 1:
+        return ShardedSession(shards=[create_session(config)])
+
+    shards = []
+    for index in range(config.shard_count):
+        shard_config = config
+        if config.profile_dir:
+            # A persistent profile directory can only be used by one browser
+            profile_dir = pl.Path(config.profile_dir) / f"shard-{index}"
+            shard_config = config._replace(profile_dir=str(profile_dir))
+        shards.append(create_session(shard_config))
+    return ShardedSession(shards=shards)
+
+
+def session_for(sharded: ShardedSession, guild_id: str | None) -> BrowserSession:
+    if guild_id is None or len(sharded.shards) == 1:
+        return sharded.shards[0]
+    return sharded.shards[shard_index(guild_id, len(sharded.shards))]
+
+
+def start_sharded_warm_up(sharded: ShardedSession) -> None:
+    first, *rest = sharded.shards
+    start_warm_up(first)
+    for shard in rest:
+        start_warm_up(shard, after=first)
+
+
+async def run_on_shard[T](
+    sharded: ShardedSession,
+    guild_id: str | None,
+    operation: Callable[[ClientState], tp.Awaitable[tuple[ClientState, T]]],
+    read_only: bool = True,
+) -> T:
+    """Run an operation on the shard that owns `guild_id`."""
+    return await run_with_session(session_for(sharded, guild_id), operation, read_only)
+
+
+async def close_sharded_session(sharded: ShardedSession) -> None:
+    await asyncio.gather(*(close_session(shard) for shard in sharded.shards))
@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+
+# Milliseconds since the Unix epoch at 2015-01-01T00:00:00Z
+DISCORD_EPOCH_MS = 1420070400000
+
+
+def parse_snowflake(value: str | int | None) -> int | None:
+    """Return `value` as an integer snowflake, or None if it is not one."""
+    if isinstance(value, int):
+        return value if value >= 0 else None
+    if value and value.isdigit():
+        return int(value)
+    return None
+
+
+def snowflake_to_datetime(snowflake: str | int) -> datetime:
+    """Creation time encoded in the top 42 bits of a snowflake ID."""
+    ms = (int(snowflake) >> 22) + DISCORD_EPOCH_MS
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+
+def datetime_to_snowflake(moment: datetime) -> int:
+    """Smallest snowflake that could have been created at `moment`.
+
+    Every ID created at or after `moment` is >= the result, so it can be used
+    directly as an exclusive lower or upper bound on message IDs.
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    ms = int(moment.timestamp() * 1000) - DISCORD_EPOCH_MS
+    return max(ms, 0) << 22
+
+
+def snowflake_bounds(
+    start: datetime | None = None, end: datetime | None = None
+) -> tuple[int | None, int | None]:
+    """Convert a [start, end) time window to (min_id, max_id) snowflakes.
+
+    A message is in the window when `min_id <= id < max_id`; a missing side
+    is left unbounded.
+    """
+    return (
+        datetime_to_snowflake(start) if start else None,
+        datetime_to_snowflake(end) if end else None,
+    )
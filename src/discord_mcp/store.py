@@ -0,0 +1,412 @@
+import dataclasses as dc
+import json
+import pathlib as pl
+import sqlite3
+from datetime import datetime
+
+from .client import DiscordGuild, DiscordMessage
+from .logger import logger
+from .snowflake import snowflake_to_datetime
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    channel_id TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    guild_id TEXT,
+    author_id TEXT NOT NULL,
+    author_name TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    edited_timestamp TEXT,
+    reply_to_id TEXT,
+    attachments TEXT NOT NULL,
+    reactions TEXT NOT NULL,
+    embeds TEXT NOT NULL,
+    stickers TEXT NOT NULL DEFAULT '[]',
+    author_username TEXT,
+    PRIMARY KEY (channel_id, id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS messages_by_guild ON messages (guild_id, id);
+
+CREATE TABLE IF NOT EXISTS guilds (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    icon TEXT,
+    fetched_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sync_ranges (
+    channel_id TEXT NOT NULL,
+    low_id INTEGER NOT NULL,
+    high_id INTEGER NOT NULL,
+    PRIMARY KEY (channel_id, low_id)
+) WITHOUT ROWID;
+"""
+
+# Columns added to `messages` after it was first created, for older stores
+_ADDED_COLUMNS = {
+    "stickers": "TEXT NOT NULL DEFAULT '[]'",
+    "author_username": "TEXT",
+}
+
+# Columns read back into a DiscordMessage, in `_from_row` order
+_MESSAGE_COLUMNS = (
+    "channel_id",
+    "id",
+    "author_id",
+    "author_name",
+    "content",
+    "timestamp",
+    "edited_timestamp",
+    "reply_to_id",
+    "attachments",
+    "reactions",
+    "embeds",
+    "stickers",
+    "author_username",
+)
+
+
+def _columns(table: str = "") -> str:
+    return ", ".join(f"{table}.{c}" if table else c for c in _MESSAGE_COLUMNS)
+
+
+# Full-text index of message content; each row's rowid is the message ID
+_INDEX_SCHEMA = """
+CREATE VIRTUAL TABLE message_index USING fts5(
+    content, tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+_IMAGE_EXTENSIONS = ("png", "jpg", "jpeg", "gif", "webp")
+_VIDEO_EXTENSIONS = ("mp4", "webm", "mov")
+
+
+def _any_extension(extensions: tuple[str, ...]) -> str:
+    return "(" + " OR ".join(f"m.attachments LIKE '%.{e}%'" for e in extensions) + ")"
+
+
+# SQL conditions for Discord's `has:` search filters
+_HAS_CONDITIONS = {
+    "file": "m.attachments != '[]'",
+    "image": _any_extension(_IMAGE_EXTENSIONS),
+    "video": _any_extension(_VIDEO_EXTENSIONS),
+    "embed": "m.embeds != '[]'",
+    "link": "(m.content LIKE '%http://%' OR m.content LIKE '%https://%')",
+}
+
+
+@dc.dataclass
+class MessageStore:
+    """Local SQLite copy of harvested messages.
+
+    Messages are keyed by channel ID and snowflake. `sync_ranges` records,
+    per channel, half-open ID ranges [low_id, high_id) whose history has
+    been read without gaps, so later reads only fetch what is outside them.
+
+    `full_text` is False when SQLite was built without FTS5, in which case
+    messages are not indexed for local search.
+    """
+
+    path: pl.Path
+    connection: sqlite3.Connection
+    full_text: bool = False
+
+
+def open_store(path: pl.Path) -> MessageStore:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(_SCHEMA)
+    _add_columns(connection)
+    full_text = _create_index(connection)
+    logger.debug(f"Opened message store at {path}")
+    return MessageStore(path=path, connection=connection, full_text=full_text)
+
+
+def _add_columns(connection: sqlite3.Connection) -> None:
+    existing = {row[1] for row in connection.execute("PRAGMA table_info(messages)")}
+    with connection:
+        for name, definition in _ADDED_COLUMNS.items():
+            if name not in existing:
+                connection.execute(
+                    f"ALTER TABLE messages ADD COLUMN {name} {definition}"
+                )
+
+
+def _create_index(connection: sqlite3.Connection) -> bool:
+    if connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'message_index'"
+    ).fetchone():
+        return True
+    try:
+        with connection:
+            connection.execute(_INDEX_SCHEMA)
+            # Index messages stored before the index existed
+            connection.execute(
+                "INSERT INTO message_index (rowid, content) SELECT id, content FROM messages"
+            )
+    except sqlite3.OperationalError as e:
+        logger.error(f"SQLite has no FTS5, local search is disabled: {e}")
+        return False
+    return True
+
+
+def close_store(store: MessageStore) -> None:
+    store.connection.close()
+
+
+def save_messages(
+    store: MessageStore, guild_id: str | None, messages: list[DiscordMessage]
+) -> None:
+    rows = [
+        (
+            m.channel_id,
+            int(m.id),
+            m.author_id,
+            m.author_name,
+            m.content,
+            (m.timestamp or snowflake_to_datetime(m.id)).isoformat(),
+            m.edited_timestamp.isoformat() if m.edited_timestamp else None,
+            m.reply_to_id,
+            json.dumps(m.attachments),
+            json.dumps(m.reactions),
+            json.dumps(m.embeds),
+            json.dumps(m.stickers),
+            m.author_username,
+            guild_id,
+        )
+        for m in messages
+        if m.id.isdigit()
+    ]
+    marks = ", ".join("?" * (len(_MESSAGE_COLUMNS) + 1))
+    with store.connection:
+        store.connection.executemany(
+            f"INSERT OR REPLACE INTO messages ({_columns()}, guild_id) VALUES ({marks})",
+            rows,
+        )
+        if store.full_text:
+            store.connection.executemany(
+                "DELETE FROM message_index WHERE rowid = ?", [(r[1],) for r in rows]
+            )
+            store.connection.executemany(
+                "INSERT INTO message_index (rowid, content) VALUES (?, ?)",
+                [(r[1], r[4]) for r in rows],
+            )
+
+
+def _from_row(row: tuple) -> DiscordMessage:
+    (
+        channel_id,
+        message_id,
+        author_id,
+        author_name,
+        content,
+        timestamp,
+        edited_timestamp,
+        reply_to_id,
+        attachments,
+        reactions,
+        embeds,
+        stickers,
+        author_username,
+    ) = row
+    return DiscordMessage(
+        id=str(message_id),
+        content=content,
+        author_name=author_name,
+        author_id=author_id,
+        channel_id=channel_id,
+        timestamp=datetime.fromisoformat(timestamp),
+        attachments=json.loads(attachments),
+        edited_timestamp=datetime.fromisoformat(edited_timestamp)
+        if edited_timestamp
+        else None,
+        reply_to_id=reply_to_id,
+        reactions=json.loads(reactions),
+        embeds=json.loads(embeds),
+        stickers=json.loads(stickers),
+        author_username=author_username,
+    )
+
+
+def load_messages(
+    store: MessageStore,
+    channel_id: str,
+    low_id: int = 0,
+    high_id: int | None = None,
+    limit: int = -1,
+    oldest_first: bool = False,
+) -> list[DiscordMessage]:
+    """Stored messages with `low_id <= id < high_id`, newest first.
+
+    With `oldest_first`, the oldest `limit` messages are returned, oldest first.
+    """
+    rows = store.connection.execute(
+        f"""
+        SELECT {_columns()}
+        FROM messages
+        WHERE channel_id = ? AND id >= ? AND (? IS NULL OR id < ?)
+        ORDER BY id {"ASC" if oldest_first else "DESC"}
+        LIMIT ?
+        """,
+        (channel_id, low_id, high_id, high_id, limit),
+    ).fetchall()
+    return [_from_row(row) for row in rows]
+
+
+def _match_expression(query: str) -> str:
+    # Quote every term so punctuation in the query is not FTS5 syntax
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def search_stored_messages(
+    store: MessageStore,
+    guild_id: str,
+    query: str = "",
+    channel_ids: list[str] | None = None,
+    authors: list[str] | None = None,
+    has: list[str] | None = None,
+    low_id: int = 0,
+    high_id: int | None = None,
+    limit: int = 25,
+    offset: int = 0,
+) -> list[DiscordMessage]:
+    """Stored messages of a guild matching a search.
+
+    Every term of `query` must appear in the content; matches are ranked
+    with BM25, then newest first. Without a query, results are newest first.
+    `authors` match usernames case-insensitively or author IDs, `has`
+    takes Discord's `has:` filter values, and IDs are bounded by
+    `low_id <= id < high_id`.
+    """
+    tables = "messages AS m"
+    conditions = ["m.guild_id = ?", "m.id >= ?"]
+    params: list = [guild_id, low_id]
+    order = "m.id DESC"
+    if query.strip():
+        if not store.full_text:
+            raise RuntimeError("The message store has no full-text index")
+        tables += " JOIN message_index ON message_index.rowid = m.id"
+        conditions.append("message_index MATCH ?")
+        params.append(_match_expression(query))
+        order = "bm25(message_index), m.id DESC"
+    if high_id is not None:
+        conditions.append("m.id < ?")
+        params.append(high_id)
+    if channel_ids:
+        conditions.append(f"m.channel_id IN ({', '.join('?' * len(channel_ids))})")
+        params.extend(channel_ids)
+    if authors:
+        marks = ", ".join("?" * len(authors))
+        conditions.append(
+            f"(lower(m.author_username) IN ({marks}) OR m.author_id IN ({marks}))"
+        )
+        params.extend(a.lower() for a in authors)
+        params.extend(authors)
+    conditions.extend(_HAS_CONDITIONS[kind] for kind in has or [])
+
+    rows = store.connection.execute(
+        f"""
+        SELECT {_columns("m")}
+        FROM {tables}
+        WHERE {" AND ".join(conditions)}
+        ORDER BY {order}
+        LIMIT ? OFFSET ?
+        """,
+        (*params, limit, offset),
+    ).fetchall()
+    return [_from_row(row) for row in rows]
+
+
+def record_sync_range(
+    store: MessageStore, channel_id: str, low_id: int, high_id: int
+) -> None:
+    """Mark [low_id, high_id) as fully read, merging overlapping ranges."""
+    if low_id >= high_id:
+        return
+    with store.connection:
+        overlapping = store.connection.execute(
+            """
+            SELECT low_id, high_id FROM sync_ranges
+            WHERE channel_id = ? AND low_id <= ? AND high_id >= ?
+            """,
+            (channel_id, high_id, low_id),
+        ).fetchall()
+        for low, high in overlapping:
+            low_id, high_id = min(low_id, low), max(high_id, high)
+        store.connection.execute(
+            "DELETE FROM sync_ranges WHERE channel_id = ? AND low_id <= ? AND high_id >= ?",
+            (channel_id, high_id, low_id),
+        )
+        store.connection.execute(
+            "INSERT INTO sync_ranges VALUES (?, ?, ?)", (channel_id, low_id, high_id)
+        )
+
+
+def sync_range_at(
+    store: MessageStore, channel_id: str, snowflake: int
+) -> tuple[int, int] | None:
+    """The fully read range containing `snowflake`, if any."""
+    return store.connection.execute(
+        """
+        SELECT low_id, high_id FROM sync_ranges
+        WHERE channel_id = ? AND low_id <= ? AND high_id > ?
+        """,
+        (channel_id, snowflake, snowflake),
+    ).fetchone()
+
+
+def is_synced(store: MessageStore, channel_id: str, low_id: int, high_id: int) -> bool:
+    """Whether all of [low_id, high_id) has been fully read."""
+    synced = sync_range_at(store, channel_id, low_id)
+    return synced is not None and synced[1] >= high_id
+
+
+def stored_channel_ids(store: MessageStore, guild_id: str) -> list[str]:
+    """IDs of the guild's channels that have stored messages."""
+    rows = store.connection.execute(
+        "SELECT DISTINCT channel_id FROM messages WHERE guild_id = ?", (guild_id,)
+    ).fetchall()
+    return [channel_id for (channel_id,) in rows]
+
+
+def latest_sync_range(store: MessageStore, channel_id: str) -> tuple[int, int] | None:
+    """The most recent fully read range of a channel, if any."""
+    return store.connection.execute(
+        """
+        SELECT low_id, high_id FROM sync_ranges
+        WHERE channel_id = ? ORDER BY high_id DESC LIMIT 1
+        """,
+        (channel_id,),
+    ).fetchone()
+
+
+def save_guilds(
+    store: MessageStore, guilds: list[DiscordGuild], fetched_at: float
+) -> None:
+    """Replace the stored guild list."""
+    with store.connection:
+        store.connection.execute("DELETE FROM guilds")
+        store.connection.executemany(
+            "INSERT INTO guilds VALUES (?, ?, ?, ?)",
+            [(g.id, g.name, g.icon, fetched_at) for g in guilds],
+        )
+
+
+def load_guilds(store: MessageStore) -> tuple[list[DiscordGuild], float] | None:
+    """The stored guild list and when it was fetched, if one is stored."""
+    rows = store.connection.execute(
+        "SELECT id, name, icon, fetched_at FROM guilds ORDER BY rowid"
+    ).fetchall()
+    if not rows:
+        return None
+    guilds = [DiscordGuild(id=id, name=name, icon=icon) for id, name, icon, _ in rows]
+    return guilds, min(row[3] for row in rows)
+
+
+def clear_guilds(store: MessageStore) -> None:
+    with store.connection:
+        store.connection.execute("DELETE FROM guilds")
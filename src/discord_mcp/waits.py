@@ -0,0 +1,129 @@
+import asyncio
+import re
+import time
+
+from playwright.async_api import Page, Request
+
+from .logger import logger
+
+_QUIET_JS = """
+    ({ selector, quietMs, timeoutMs }) => new Promise(resolve => {
+        const target = (selector && document.querySelector(selector)) || document.body;
+        let quietTimer = null;
+        let deadline = null;
+        const observer = new MutationObserver(() => {
+            clearTimeout(quietTimer);
+            quietTimer = setTimeout(() => finish(true), quietMs);
+        });
+        const finish = quiet => {
+            observer.disconnect();
+            clearTimeout(quietTimer);
+            clearTimeout(deadline);
+            resolve(quiet);
+        };
+        observer.observe(target, { childList: true, subtree: true, characterData: true });
+        quietTimer = setTimeout(() => finish(true), quietMs);
+        deadline = setTimeout(() => finish(false), timeoutMs);
+    })
+"""
+
+
+async def wait_for_quiet(
+    page: Page,
+    selector: str | None = None,
+    quiet_ms: int = 250,
+    timeout_ms: int = 3000,
+) -> bool:
+    """Wait until the DOM under `selector` stops changing for `quiet_ms`.
+
+    `timeout_ms` is only an upper bound: this returns as soon as the DOM is
+    quiet, and False if mutations were still happening at the deadline.
+    """
+    try:
+        return await page.evaluate(
+            _QUIET_JS,
+            {"selector": selector, "quietMs": quiet_ms, "timeoutMs": timeout_ms},
+        )
+    except Exception as e:
+        logger.debug(f"Quiet wait failed: {e}")
+        return False
+
+
+class RequestTracker:
+    """Counts in-flight requests whose URL matches a pattern."""
+
+    def __init__(self, page: Page, pattern: str) -> None:
+        self._page = page
+        self._pattern = re.compile(pattern)
+        self._in_flight: set[Request] = set()
+        self._last_activity = time.monotonic()
+        self._changed = asyncio.Event()
+        self.started = 0
+
+    def _matches(self, request: Request) -> bool:
+        return bool(self._pattern.search(request.url))
+
+    def _on_request(self, request: Request) -> None:
+        if self._matches(request):
+            self._in_flight.add(request)
+            self.started += 1
+            self._touch()
+
+    def _on_done(self, request: Request) -> None:
+        if request in self._in_flight:
+            self._in_flight.discard(request)
+            self._touch()
+
+    def _touch(self) -> None:
+        self._last_activity = time.monotonic()
+        self._changed.set()
+
+    def start(self) -> "RequestTracker":
+        self._page.on("request", self._on_request)
+        self._page.on("requestfinished", self._on_done)
+        self._page.on("requestfailed", self._on_done)
+        return self
+
+    def stop(self) -> None:
+        self._page.remove_listener("request", self._on_request)
+        self._page.remove_listener("requestfinished", self._on_done)
+        self._page.remove_listener("requestfailed", self._on_done)
+
+    async def wait_for_idle(self, quiet_ms: int = 150, timeout_ms: int = 3000) -> bool:
+        """Wait until no matching request has been in flight for `quiet_ms`."""
+        deadline = time.monotonic() + timeout_ms / 1000
+        while True:
+            now = time.monotonic()
+            idle_for = now - self._last_activity
+            if not self._in_flight and idle_for * 1000 >= quiet_ms:
+                return True
+            if now >= deadline:
+                return False
+            self._changed.clear()
+            if self._in_flight:
+                wake_in = deadline - now
+            else:
+                wake_in = min(deadline - now, quiet_ms / 1000 - idle_for)
+            try:
+                await asyncio.wait_for(self._changed.wait(), wake_in)
+            except TimeoutError:
+                pass
+
+    async def wait_for_start(self, since: int, timeout_ms: int = 1000) -> bool:
+        """Wait until a request starts after `started` was equal to `since`."""
+        deadline = time.monotonic() + timeout_ms / 1000
+        while self.started <= since:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except TimeoutError:
+                pass
+        return True
+
+
+def track_requests(page: Page, pattern: str) -> RequestTracker:
+    """Start tracking requests matching `pattern`; call `stop()` when done."""
+    return RequestTracker(page, pattern).start()
@@ -172,7 +172,12 @@ async def test_mcp_read_messages_tool(real_config, test_env):
             assert result.content, "No content in result - expected to find messages"
             _check_error(result)
 
-            messages_data = [json.loads(text) for text in _extract_text(result.content)]
+            texts = _extract_text(result.content)
+            assert len(texts) == 1
+            data = json.loads(texts[0])
+            assert "next_after_id" in data
+            assert "next_before_id" in data
+            messages_data = data["messages"]
             assert isinstance(messages_data, list)
 
             print(
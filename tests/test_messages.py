@@ -0,0 +1,160 @@
+import asyncio
+import typing as tp
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.discord_mcp import messages
+from src.discord_mcp.client import ClientState, DiscordMessage
+from src.discord_mcp.messages import _read_window, read_recent_messages
+from src.discord_mcp.snowflake import datetime_to_snowflake, snowflake_to_datetime
+from src.discord_mcp.store import close_store, latest_sync_range, open_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = open_store(tmp_path / "messages.db")
+    yield store
+    close_store(store)
+
+
+def _snowflake(hours_ago: float) -> int:
+    return datetime_to_snowflake(
+        datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+    )
+
+
+class FakeChannel:
+    """Stands in for `iter_channel_messages` over a channel's message IDs."""
+
+    def __init__(self, ids: list[int]) -> None:
+        self.ids = ids
+        self.reads: list[tuple[str | None, str | None, int]] = []
+
+    async def __call__(
+        self,
+        state,
+        server_id,
+        channel_id,
+        limit,
+        before=None,
+        after=None,
+        coverage=None,
+        oldest_first=False,
+    ):
+        self.reads.append((after, before, limit))
+        floor = int(after) + 1 if after else 0
+        top = int(before) if before else None
+        window = sorted(
+            (i for i in self.ids if i >= floor and (top is None or i < top)),
+            reverse=not oldest_first,
+        )
+        batch = window[:limit]
+        if batch:
+            yield [
+                DiscordMessage(
+                    id=str(i),
+                    content=f"message {i}",
+                    author_name="alice",
+                    author_id="1",
+                    channel_id=channel_id,
+                    timestamp=snowflake_to_datetime(i),
+                    attachments=[],
+                )
+                for i in batch
+            ]
+        if coverage is None:
+            return
+        if oldest_first:
+            coverage.oldest_id = floor
+            if len(window) > limit:
+                coverage.newest_id = max(batch) + 1
+        elif batch or len(window) <= limit:
+            coverage.oldest_id = floor if len(window) <= limit else min(batch)
+
+
+@pytest.fixture
+def channel(monkeypatch):
+    channel = FakeChannel([_snowflake(hours) for hours in (5, 4, 3, 2, 1)])
+    monkeypatch.setattr(messages, "iter_channel_messages", channel)
+    return channel
+
+
+def _synced_range(store) -> tuple[int, int]:
+    synced = latest_sync_range(store, "10")
+    assert synced is not None
+    return synced
+
+
+async def _read(store, max_messages: int, after_id: int | None = None) -> list[int]:
+    _, read = await read_recent_messages(
+        tp.cast(ClientState, None),
+        "5",
+        "10",
+        hours_back=24,
+        max_messages=max_messages,
+        after_id=str(after_id) if after_id else None,
+        store=store,
+    )
+    return [int(m.id) for m in read]
+
+
+def test_read_window_uses_tightest_bounds():
+    after = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    before = datetime(2024, 2, 1, tzinfo=timezone.utc)
+    after_id = datetime_to_snowflake(datetime(2024, 1, 10, tzinfo=timezone.utc))
+
+    assert _read_window(24, None, None, after, before) == (
+        datetime_to_snowflake(after),
+        datetime_to_snowflake(before),
+    )
+    assert _read_window(24, str(after_id), None, after, None) == (after_id + 1, None)
+    assert _read_window(24, None, "100", None, None) == (0, 100)
+
+    # hours_back only applies without any bound
+    floor, top = _read_window(2, None, None, None, None)
+    assert top is None
+    assert _snowflake(2.01) < floor < _snowflake(1.99)
+
+
+@pytest.mark.asyncio
+async def test_first_read_syncs_the_window(store, channel):
+    assert await _read(store, 10) == sorted(channel.ids, reverse=True)
+    assert len(channel.reads) == 1
+    low, high = _synced_range(store)
+    assert low < min(channel.ids) and high > max(channel.ids)
+
+
+@pytest.mark.asyncio
+async def test_repeat_read_only_fetches_newer_messages(store, channel):
+    await _read(store, 10)
+    _, synced_to = _synced_range(store)
+    # Posted right after the first read
+    channel.ids.append(synced_to + 1)
+    await asyncio.sleep(0.002)
+
+    assert await _read(store, 10) == sorted(channel.ids, reverse=True)
+    after, before, _ = channel.reads[-1]
+    assert (after, before) == (str(synced_to - 1), None)
+
+
+@pytest.mark.asyncio
+async def test_gap_below_synced_range_is_filled(store, channel):
+    newest_two = sorted(channel.ids, reverse=True)[:2]
+    assert await _read(store, 2) == newest_two
+    assert _synced_range(store)[0] == newest_two[-1]
+
+    assert await _read(store, 5) == sorted(channel.ids, reverse=True)
+    # Nothing new, so only the history below the synced range is read
+    _, before, limit = channel.reads[-1]
+    assert (before, limit) == (str(newest_two[-1]), 3)
+    assert _synced_range(store)[0] < min(channel.ids)
+
+
+@pytest.mark.asyncio
+async def test_cursor_read_returns_oldest_messages_after_it(store, channel):
+    ids = sorted(channel.ids)
+    assert await _read(store, 2, after_id=ids[0]) == [ids[2], ids[1]]
+    # The next poll resumes right after the newest message returned
+    assert await _read(store, 2, after_id=ids[2]) == [ids[4], ids[3]]
+    assert await _read(store, 2, after_id=ids[4]) == []
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+
+from src.discord_mcp.snowflake import (
+    datetime_to_snowflake,
+    parse_snowflake,
+    snowflake_bounds,
+    snowflake_to_datetime,
+)
+
+
+def test_snowflake_to_datetime():
+    """Known snowflake from Discord's API documentation."""
+    assert snowflake_to_datetime("175928847299117063") == datetime(
+        2016, 4, 30, 11, 18, 25, 796000, tzinfo=timezone.utc
+    )
+
+
+def test_datetime_round_trip_is_a_lower_bound():
+    moment = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    snowflake = datetime_to_snowflake(moment)
+    assert snowflake_to_datetime(snowflake) == moment
+    assert datetime_to_snowflake(moment - timedelta(milliseconds=1)) < snowflake
+
+
+def test_naive_datetime_is_utc():
+    naive = datetime(2024, 5, 1, 12, 30)
+    aware = naive.replace(tzinfo=timezone.utc)
+    assert datetime_to_snowflake(naive) == datetime_to_snowflake(aware)
+
+
+def test_snowflake_bounds():
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    assert snowflake_bounds(start, end) == (
+        datetime_to_snowflake(start),
+        datetime_to_snowflake(end),
+    )
+    assert snowflake_bounds() == (None, None)
+
+
+def test_parse_snowflake():
+    assert parse_snowflake("175928847299117063") == 175928847299117063
+    assert parse_snowflake(42) == 42
+    assert parse_snowflake("search-3") is None
+    assert parse_snowflake("") is None
+    assert parse_snowflake(None) is None
@@ -0,0 +1,163 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from src.discord_mcp.client import DiscordGuild, DiscordMessage
+from src.discord_mcp.store import (
+    clear_guilds,
+    close_store,
+    is_synced,
+    latest_sync_range,
+    load_guilds,
+    load_messages,
+    open_store,
+    record_sync_range,
+    save_guilds,
+    save_messages,
+    search_stored_messages,
+    stored_channel_ids,
+    sync_range_at,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = open_store(tmp_path / "messages.db")
+    yield store
+    close_store(store)
+
+
+def _message(message_id: int, channel_id: str = "10", **kwargs) -> DiscordMessage:
+    return DiscordMessage(
+        id=str(message_id),
+        content=kwargs.pop("content", f"message {message_id}"),
+        author_name=kwargs.pop("author_name", "alice"),
+        author_id=kwargs.pop("author_id", "1"),
+        channel_id=channel_id,
+        timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        attachments=kwargs.pop("attachments", []),
+        **kwargs,
+    )
+
+
+def test_save_and_load_newest_first(store):
+    save_messages(store, "5", [_message(100), _message(300), _message(200)])
+    save_messages(store, "5", [_message(400, channel_id="11")])
+
+    assert [m.id for m in load_messages(store, "10")] == ["300", "200", "100"]
+    assert [m.id for m in load_messages(store, "10", 150, 300)] == ["200"]
+    assert [m.id for m in load_messages(store, "10", limit=1)] == ["300"]
+
+
+def test_save_round_trips_metadata_and_replaces(store):
+    message = _message(
+        100,
+        reply_to_id="50",
+        reactions=[{"emoji": "👍", "count": 2}],
+        embeds=[{"title": None, "url": None, "description": "Build passed"}],
+        stickers=["wave"],
+        author_username="alice_1",
+    )
+    save_messages(store, "5", [message])
+    assert load_messages(store, "10") == [message]
+
+    save_messages(store, "5", [_message(100, content="edited")])
+    assert [m.content for m in load_messages(store, "10")] == ["edited"]
+
+
+def test_open_adds_columns_to_older_stores(tmp_path):
+    store = open_store(tmp_path / "messages.db")
+    store.connection.execute("ALTER TABLE messages DROP COLUMN stickers")
+    store.connection.execute("ALTER TABLE messages DROP COLUMN author_username")
+    close_store(store)
+
+    store = open_store(tmp_path / "messages.db")
+    save_messages(store, "5", [_message(100, stickers=["wave"], author_username="al")])
+    assert load_messages(store, "10")[0].stickers == ["wave"]
+    assert load_messages(store, "10")[0].author_username == "al"
+    close_store(store)
+
+
+def test_sync_ranges_merge(store):
+    record_sync_range(store, "10", 100, 200)
+    record_sync_range(store, "10", 300, 400)
+    assert sync_range_at(store, "10", 250) is None
+    assert latest_sync_range(store, "10") == (300, 400)
+
+    # Touching ranges and ranges bridged by a new one are merged
+    record_sync_range(store, "10", 200, 300)
+    assert sync_range_at(store, "10", 250) == (100, 400)
+    assert sync_range_at(store, "10", 400) is None
+
+    record_sync_range(store, "10", 150, 500)
+    assert latest_sync_range(store, "10") == (100, 500)
+    assert latest_sync_range(store, "11") is None
+    assert is_synced(store, "10", 100, 500)
+    assert not is_synced(store, "10", 100, 501)
+    assert not is_synced(store, "10", 50, 200)
+
+
+def test_guilds_are_replaced_and_keep_order(store):
+    assert load_guilds(store) is None
+    save_guilds(store, [DiscordGuild("2", "b"), DiscordGuild("1", "a")], 1000.0)
+    save_guilds(store, [DiscordGuild("3", "c"), DiscordGuild("2", "b")], 2000.0)
+    assert load_guilds(store) == (
+        [DiscordGuild("3", "c"), DiscordGuild("2", "b")],
+        2000.0,
+    )
+    clear_guilds(store)
+    assert load_guilds(store) is None
+
+
+def test_search_ranks_and_filters(store):
+    save_messages(
+        store,
+        "5",
+        [
+            _message(100, content="deploy, deploy"),
+            _message(
+                200,
+                content="deploy went fine today",
+                author_name="Bobby",
+                author_id="2",
+                author_username="bob",
+            ),
+            _message(300, content="lunch?"),
+            _message(400, channel_id="11", content="deploy: see https://example.com"),
+            _message(500, content="screenshot", attachments=["https://cdn/a.png?ex=1"]),
+        ],
+    )
+    save_messages(store, "6", [_message(600, channel_id="12", content="deploy")])
+    assert sorted(stored_channel_ids(store, "5")) == ["10", "11"]
+
+    def ids(**kwargs):
+        return [m.id for m in search_stored_messages(store, "5", **kwargs)]
+
+    # Best match first
+    assert ids(query="deploy") == ["100", "200", "400"]
+    assert ids(query="DEPLOY fine") == ["200"]
+    assert ids(query='deploy "quoted') == []
+    assert ids(query="deploy", channel_ids=["10"], authors=["BOB"]) == ["200"]
+    # Display names are not what Discord's from: filter matches
+    assert ids(authors=["bobby"]) == []
+    assert ids(authors=["2"]) == ["200"]
+    assert ids(query="deploy", low_id=150, high_id=400) == ["200"]
+    assert ids(has=["link"]) == ["400"]
+    assert ids(has=["image"]) == ["500"]
+    assert ids(limit=2, offset=1) == ["400", "300"]
+
+    # Re-saved messages are re-indexed
+    save_messages(store, "5", [_message(300, content="deploy")])
+    assert ids(query="lunch") == []
+    assert sorted(ids(query="deploy", channel_ids=["10"])) == ["100", "200", "300"]
+
+
+def test_search_indexes_messages_stored_before_the_index(tmp_path):
+    store = open_store(tmp_path / "messages.db")
+    save_messages(store, "5", [_message(100, content="hello world")])
+    store.connection.execute("DROP TABLE message_index")
+    close_store(store)
+
+    store = open_store(tmp_path / "messages.db")
+    assert [m.id for m in search_stored_messages(store, "5", "world")] == ["100"]
+    close_store(store)